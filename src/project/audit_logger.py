@@ -1,35 +1,280 @@
 """
 VERITAS Audit Logger
 Immutable audit trail for all VERITAS decisions
+
+Every entry carries the SHA-256 hash of the entry before it ("prev_hash"),
+so any edit, insertion or deletion breaks the chain and is detected by
+AuditLogger.verify_chain().
 """
 
-import json
+import atexit
+import hashlib
+import mmap
 import os
-from datetime import datetime
-from typing import Optional, List, Dict, Any
+import queue
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable, Optional, List, Dict, Any, Iterator, Tuple
 from pathlib import Path
 
+import orjson
+
+
+class _AsyncAuditWriter(threading.Thread):
+    """
+    Background thread that owns the session file descriptors and writes
+    queued entries in batches, keeping disk I/O off the agents' path.
+    """
+
+    # Raw append-only descriptors: each batch is a single os.write, with no
+    # Python-level buffering layer in between
+    _OPEN_FLAGS = (
+        os.O_WRONLY | os.O_APPEND | os.O_CREAT
+        | getattr(os, "O_CLOEXEC", 0) | getattr(os, "O_BINARY", 0)
+    )
+    # Session logs hold user input, so keep them private to the owner
+    _FILE_MODE = 0o600
+
+    # Queue message kinds
+    _WRITE = 0
+    _RELEASE = 1
+    _SYNC = 2
+    _CLOSE = 3
+
+    # Most entries gathered into one batch, and how long to wait for them
+    BATCH_SIZE = 256
+    BATCH_WAIT_S = 0.01
+
+    def __init__(
+        self,
+        max_open_handles: int,
+        on_error: Callable[[Path, OSError], None],
+        previous: Optional["_AsyncAuditWriter"] = None
+    ):
+        super().__init__(name="veritas-audit-writer", daemon=True)
+        self._queue: "queue.SimpleQueue[Tuple[int, Optional[Path], Any]]" = queue.SimpleQueue()
+        # Set once a close is queued; nothing is queued after it
+        self._closing: Optional[threading.Event] = None
+        self._queue_lock = threading.Lock()
+        # A closing writer this one replaces; its entries are written first
+        self._previous = previous
+        # Descriptors reused across batches, least recently used first
+        self._fds: "OrderedDict[Path, int]" = OrderedDict()
+        self._max_open_handles = max_open_handles
+        # Called with the path and error when a session file can't be written
+        self._on_error = on_error
+        self._error: Optional[BaseException] = None
+        self.start()
+
+    def put(self, filepath: Path, data: bytes) -> bool:
+        """Queue bytes to be appended to a session file.
+        
+        Returns False, without queueing, once the writer is closing.
+        """
+        with self._queue_lock:
+            if self._closing is not None:
+                return False
+            self._queue.put((self._WRITE, filepath, data))
+            return True
+
+    def release(self, filepath: Path) -> None:
+        """Close a session file's descriptor once its queued entries are written."""
+        with self._queue_lock:
+            # Closing releases every descriptor anyway
+            if self._closing is None:
+                self._queue.put((self._RELEASE, filepath, None))
+
+    def flush_sync(self) -> None:
+        """Block until everything queued so far is on disk."""
+        self._wait(self._request(self._SYNC))
+
+    def close(self) -> None:
+        """Write everything queued so far, close all descriptors and stop the thread."""
+        try:
+            self._wait(self._request(self._CLOSE))
+        finally:
+            self.join()
+
+    def _request(self, kind: int) -> threading.Event:
+        """Queue a sync or close behind everything queued so far."""
+        with self._queue_lock:
+            # Once closing, the close request also covers later ones
+            if self._closing is not None:
+                return self._closing
+            done = threading.Event()
+            self._queue.put((kind, None, done))
+            if kind == self._CLOSE:
+                self._closing = done
+            return done
+
+    def _wait(self, done: threading.Event) -> None:
+        done.wait()
+        
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    def run(self) -> None:
+        # Keep each session's entries in order across a close and restart
+        if self._previous is not None:
+            self._previous.join()
+            self._previous = None
+        
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.BATCH_WAIT_S
+            
+            # Gather more writes until the batch is full, a control message arrives, or time is up
+            while len(batch) < self.BATCH_SIZE and batch[-1][0] == self._WRITE:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            
+            try:
+                self._process(batch)
+            except Exception as e:
+                self._error = e
+                # Never leave a flush_sync() caller waiting on a failed batch
+                for kind, _, payload in batch:
+                    if kind in (self._SYNC, self._CLOSE):
+                        payload.set()
+            
+            # A close request is always the last message of its batch
+            if batch[-1][0] == self._CLOSE:
+                return
+
+    def _process(self, batch: List[Tuple[int, Optional[Path], Any]]) -> None:
+        pending: Dict[Path, List[bytes]] = {}
+        
+        for kind, filepath, payload in batch:
+            if kind == self._WRITE:
+                pending.setdefault(filepath, []).append(payload)
+                continue
+            
+            self._write_pending(pending)
+            if kind == self._RELEASE:
+                fd = self._fds.pop(filepath, None)
+                if fd is not None:
+                    os.close(fd)
+            else:
+                if kind == self._CLOSE:
+                    while self._fds:
+                        _, fd = self._fds.popitem(last=False)
+                        os.close(fd)
+                payload.set()
+        
+        self._write_pending(pending)
+
+    def _write_pending(self, pending: Dict[Path, List[bytes]]) -> None:
+        # Files are written independently: one that fails doesn't hold back the others
+        for filepath, chunks in pending.items():
+            try:
+                self._write_file(filepath, b''.join(chunks))
+            except OSError as e:
+                fd = self._fds.pop(filepath, None)
+                if fd is not None:
+                    try:
+                        os.close(fd)
+                    except OSError:
+                        pass
+                self._on_error(filepath, e)
+        pending.clear()
+
+    def _write_file(self, filepath: Path, data: bytes) -> None:
+        fd = self._fds.get(filepath)
+        if fd is None:
+            if len(self._fds) >= self._max_open_handles:
+                _, lru_fd = self._fds.popitem(last=False)
+                os.close(lru_fd)
+            fd = os.open(filepath, self._OPEN_FLAGS, self._FILE_MODE)
+            self._fds[filepath] = fd
+        else:
+            self._fds.move_to_end(filepath)
+        
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+
 
 class AuditLogger:
     """
     Logs all VERITAS decisions and creates an immutable audit trail.
     """
+
+    # Maximum number of session files kept open at once
+    MAX_OPEN_HANDLES = 64
+    # prev_hash of the first entry in a session
+    GENESIS_HASH = bytes(32)
+    # Canonical form of an entry for hashing and writing. Non-string keys are
+    # written as strings (as json.dumps did), so they read back unchanged.
+    _DUMP_OPTIONS = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS
+    # Coarsest file timestamp step the mtime-keyed caches allow for
+    _MTIME_SETTLE_NS = 1_000_000_000
     
     def __init__(self, log_dir: str = "audit_logs"):
         """Initialize the audit logger with a log directory."""
         self.log_dir = Path(log_dir)
         self.log_dir.mkdir(parents=True, exist_ok=True)
         self.current_session: Optional[str] = None
+        # Session file paths of sessions started on this logger
+        self._session_paths: Dict[str, Path] = {}
+        # (log_dir mtime, session IDs) from the last directory scan
+        self._sessions_cache: Optional[Tuple[int, List[str]]] = None
+        # Per-file statistics keyed by session file, tagged with (mtime, size)
+        self._stats_cache: Dict[Path, Tuple[Tuple[int, int], Tuple[Dict[str, int], int, float]]] = {}
+        # Hash of the latest entry per session file, guarded by that file's lock
+        self._last_hash: Dict[Path, bytes] = {}
+        # Write failures not yet reported, per session file (same lock)
+        self._write_errors: Dict[Path, OSError] = {}
+        self._locks: Dict[Path, threading.Lock] = {}
+        # Guards the lock table and the writer slot
+        self._lock = threading.Lock()
+        # Started on the first write and stopped by close()
+        self._writer: Optional[_AsyncAuditWriter] = None
+        # The last writer stopped by close(), possibly still writing
+        self._retired: Optional[_AsyncAuditWriter] = None
+
+    def __enter__(self) -> "AuditLogger":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def flush(self) -> None:
+        """Block until all logged entries are written to disk."""
+        writer = self._writer or self._retired
+        if writer is not None:
+            writer.flush_sync()
+
+    def close(self) -> None:
+        """Write pending entries, close all open session files and stop the writer thread.
+        
+        Logging again afterwards starts a new writer.
+        """
+        with self._lock:
+            writer, self._writer = self._writer, None
+            if writer is None:
+                return
+            self._retired = writer
+            # Unregistered under the lock, so a writer started meanwhile keeps its hook
+            atexit.unregister(self.close)
+        writer.close()
         
     def start_session(self, session_id: str) -> None:
         """Start a new audit session."""
         self.current_session = session_id
         session_file = self.log_dir / f"session_{session_id}.jsonl"
+        self._session_paths[session_id] = session_file
         
         # Log session start
         self._append_log(session_file, {
             "event": "session_start",
-            "timestamp": datetime.now().isoformat(),
             "session_id": session_id
         })
     
@@ -44,11 +289,10 @@ class AuditLogger:
         if not sid:
             raise ValueError("No session ID available")
         
-        session_file = self.log_dir / f"session_{sid}.jsonl"
+        session_file = self._session_file(sid)
         
         self._append_log(session_file, {
             "event": "agent_report",
-            "timestamp": datetime.now().isoformat(),
             "session_id": sid,
             "agent": agent_name,
             "report": report
@@ -64,11 +308,10 @@ class AuditLogger:
         if not sid:
             raise ValueError("No session ID available")
         
-        session_file = self.log_dir / f"session_{sid}.jsonl"
+        session_file = self._session_file(sid)
         
         self._append_log(session_file, {
             "event": "trust_certificate",
-            "timestamp": datetime.now().isoformat(),
             "session_id": sid,
             "certificate": certificate
         })
@@ -86,11 +329,10 @@ class AuditLogger:
         if not sid:
             raise ValueError("No session ID available")
         
-        session_file = self.log_dir / f"session_{sid}.jsonl"
+        session_file = self._session_file(sid)
         
         self._append_log(session_file, {
             "event": "decision",
-            "timestamp": datetime.now().isoformat(),
             "session_id": sid,
             "decision": decision,
             "reason": reason,
@@ -108,39 +350,85 @@ class AuditLogger:
         if not sid:
             raise ValueError("No session ID available")
         
-        session_file = self.log_dir / f"session_{sid}.jsonl"
+        session_file = self._session_file(sid)
         
         self._append_log(session_file, {
             "event": "session_end",
-            "timestamp": datetime.now().isoformat(),
             "session_id": sid,
             "processing_time_ms": processing_time_ms
         })
         
+        # The session is over, so make it durable and release its descriptor
+        writer = self._get_writer()
+        writer.release(session_file)
+        writer.flush_sync()
+        with self._lock_for(session_file):
+            self._last_hash.pop(session_file, None)
+            error = self._write_errors.pop(session_file, None)
+            # Drop the file's lock with its state; a later entry makes a new one
+            with self._lock:
+                del self._locks[session_file]
+        self._session_paths.pop(sid, None)
+        
         self.current_session = None
+        if error is not None:
+            raise error
     
     def get_session_history(self, session_id: str) -> List[Dict[str, Any]]:
         """Retrieve the full history of a session."""
-        session_file = self.log_dir / f"session_{session_id}.jsonl"
+        session_file = self._session_file(session_id)
+        
+        # Make sure queued entries are visible to the reader
+        self.flush()
+        self._raise_write_error(session_file)
         
         if not session_file.exists():
             return []
         
-        history = []
-        with open(session_file, 'r') as f:
-            for line in f:
-                if line.strip():
-                    history.append(json.loads(line))
+        # Entries never contain raw newlines, so the lines join into one JSON
+        # array that orjson parses in a single call
+        return orjson.loads(b'[' + b','.join(self._iter_lines(session_file)) + b']')
+    
+    def verify_chain(self, session_id: str) -> bool:
+        """Check that a session's hash chain is intact (no edited or missing entries)."""
+        session_file = self._session_file(session_id)
+        
+        self.flush()
+        self._raise_write_error(session_file)
+        
+        if not session_file.exists():
+            return False
         
-        return history
+        prev = self.GENESIS_HASH
+        for line in self._iter_lines(session_file):
+            entry = orjson.loads(line)
+            if entry.pop("prev_hash", None) != prev.hex():
+                return False
+            prev = self._hash_entry(prev, entry)
+        
+        return True
     
     def get_all_sessions(self) -> List[str]:
         """Get list of all session IDs."""
+        # A started session's file only appears once its first entry is written
+        self.flush()
+        
+        # Creating or removing a session file bumps the directory mtime
+        dir_mtime = self.log_dir.stat().st_mtime_ns
+        if self._sessions_cache is not None and self._sessions_cache[0] == dir_mtime:
+            return list(self._sessions_cache[1])
+        
         sessions = []
         for f in self.log_dir.glob("session_*.jsonl"):
             session_id = f.stem.replace("session_", "")
             sessions.append(session_id)
-        return sorted(sessions)
+        sessions.sort()
+        
+        # A file created within the same timestamp tick as this scan would not
+        # move the mtime, so only a directory that has been quiet is cached
+        if time.time_ns() - dir_mtime >= self._MTIME_SETTLE_NS:
+            self._sessions_cache = (dir_mtime, sessions)
+        return list(sessions)
     
     def get_statistics(self) -> Dict[str, Any]:
         """Get aggregate statistics across all sessions."""
@@ -151,41 +439,203 @@ class AuditLogger:
             "common_issues": {}
         }
         
-        processing_times = []
+        decisions = stats["decisions"]
+        timed_sessions = 0
+        avg_processing_time = 0.0
         
+        # get_all_sessions flushes queued entries first
         for session_id in self.get_all_sessions():
             stats["total_sessions"] += 1
-            history = self.get_session_history(session_id)
+            session_decisions, session_timed, session_avg = self._session_stats(
+                self._session_file(session_id)
+            )
             
-            for event in history:
-                if event["event"] == "decision":
-                    decision = event.get("decision", "unknown")
-                    if decision in stats["decisions"]:
-                        stats["decisions"][decision] += 1
-                
-                if event["event"] == "session_end":
-                    pt = event.get("processing_time_ms", 0)
-                    if pt > 0:
-                        processing_times.append(pt)
-        
-        if processing_times:
-            stats["avg_processing_time_ms"] = sum(processing_times) / len(processing_times)
+            for decision, count in session_decisions.items():
+                decisions[decision] += count
+            if session_timed:
+                timed_sessions += session_timed
+                avg_processing_time += (session_avg - avg_processing_time) * session_timed / timed_sessions
+        
+        if timed_sessions:
+            stats["avg_processing_time_ms"] = avg_processing_time
         
         return stats
     
+    def _session_stats(self, session_file: Path) -> Tuple[Dict[str, int], int, float]:
+        """Count decisions and average processing time for one session file.
+        
+        Results are cached by the file's mtime and size, so unchanged sessions
+        are not re-read on subsequent get_statistics calls.
+        """
+        st = session_file.stat()
+        version = (st.st_mtime_ns, st.st_size)
+        cached = self._stats_cache.get(session_file)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        
+        decisions = {"proceed": 0, "warn": 0, "block": 0}
+        timed = 0
+        avg_processing_time = 0.0
+        
+        # Only decision and session_end events contribute; jump straight to
+        # the lines that mention them and never touch the rest
+        for line in self._iter_lines(session_file, b'"decision"'):
+            event = orjson.loads(line)
+            if event["event"] == "decision":
+                decision = event.get("decision", "unknown")
+                if decision in decisions:
+                    decisions[decision] += 1
+        
+        for line in self._iter_lines(session_file, b'"session_end"'):
+            event = orjson.loads(line)
+            if event["event"] == "session_end":
+                pt = event.get("processing_time_ms", 0)
+                if pt > 0:
+                    timed += 1
+                    avg_processing_time += (pt - avg_processing_time) / timed
+        
+        result = (decisions, timed, avg_processing_time)
+        self._stats_cache[session_file] = (version, result)
+        return result
+    
+    def _session_file(self, session_id: str) -> Path:
+        """Get the JSONL file for a session, reusing the path built in start_session."""
+        session_file = self._session_paths.get(session_id)
+        if session_file is None:
+            session_file = self.log_dir / f"session_{session_id}.jsonl"
+        return session_file
+    
+    def _iter_lines(self, filepath: Path, marker: Optional[bytes] = None) -> Iterator[bytes]:
+        """Yield the non-empty lines of a session file via a read-only mmap.
+        
+        With a marker, only lines containing it are yielded; the scan for the
+        marker runs in C via mm.find, so other lines cost no Python work.
+        """
+        with open(filepath, 'rb') as f:
+            # mmap cannot map an empty file
+            if os.fstat(f.fileno()).st_size == 0:
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                start = 0
+                size = len(mm)
+                while start < size:
+                    if marker is not None:
+                        hit = mm.find(marker, start)
+                        if hit == -1:
+                            return
+                        start = mm.rfind(b'\n', start, hit) + 1 or start
+                    end = mm.find(b'\n', start)
+                    if end == -1:
+                        end = size
+                    if end > start:
+                        yield mm[start:end]
+                    start = end + 1
+    
     def _append_log(self, filepath: Path, data: Dict[str, Any]) -> None:
         """Append a log entry to a file (JSONL format)."""
-        with open(filepath, 'a') as f:
-            f.write(json.dumps(data) + '\n')
+        # Integer nanoseconds since the epoch, stamped once here for every event
+        data["timestamp"] = time.time_ns()
+        canonical = orjson.dumps(data, option=self._DUMP_OPTIONS)
+        
+        with self._lock_for(filepath):
+            prev = self._last_hash.get(filepath)
+            if prev is None:
+                prev = self._read_last_hash(filepath)
+            self._last_hash[filepath] = hashlib.sha256(prev + canonical).digest()
+            line = canonical[:-1] + b',"prev_hash":"' + prev.hex().encode() + b'"}\n'
+            # Queued under the lock so the write order matches the chain order.
+            # A writer closed meanwhile refuses the entry; the next one takes it.
+            while not self._get_writer().put(filepath, line):
+                pass
+        
+        # An earlier entry for this file was lost; this one is queued and
+        # chained onto what is on disk, so report the old failure now
+        self._raise_write_error(filepath)
+    
+    def _get_writer(self) -> _AsyncAuditWriter:
+        """Get the writer thread, starting it on first use."""
+        writer = self._writer
+        if writer is None:
+            with self._lock:
+                if self._writer is None:
+                    self._writer = _AsyncAuditWriter(
+                        self.MAX_OPEN_HANDLES, self._write_failed, self._retired
+                    )
+                    # Entries still queued at interpreter exit are written out
+                    atexit.register(self.close)
+                writer = self._writer
+        return writer
+    
+    def _write_failed(self, filepath: Path, error: OSError) -> None:
+        """Writer callback: entries for filepath were lost.
+        
+        The chain restarts from what is actually on disk, and the error is
+        kept for the next caller that touches this session.
+        """
+        with self._lock_for(filepath):
+            self._last_hash.pop(filepath, None)
+            self._write_errors[filepath] = error
+    
+    def _raise_write_error(self, filepath: Path) -> None:
+        """Raise (once) a write failure recorded for filepath."""
+        # Readers of ended sessions get here too; don't make them a lock for nothing
+        if filepath not in self._write_errors:
+            return
+        with self._lock_for(filepath):
+            error = self._write_errors.pop(filepath, None)
+        if error is not None:
+            raise error
+    
+    def _read_last_hash(self, filepath: Path) -> bytes:
+        """Recompute the hash of the last entry on disk to resume a session's chain."""
+        if not filepath.exists() or filepath.stat().st_size == 0:
+            return self.GENESIS_HASH
+        
+        with open(filepath, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                end = len(mm)
+                while end > 0 and mm[end - 1:end] == b'\n':
+                    end -= 1
+                if end == 0:
+                    return self.GENESIS_HASH
+                start = mm.rfind(b'\n', 0, end) + 1
+                entry = orjson.loads(mm[start:end])
+        
+        prev_hex = entry.pop("prev_hash", None)
+        prev = bytes.fromhex(prev_hex) if prev_hex else self.GENESIS_HASH
+        return self._hash_entry(prev, entry)
+    
+    @staticmethod
+    def _hash_entry(prev: bytes, entry: Dict[str, Any]) -> bytes:
+        """Hash an entry (without its prev_hash) chained onto the previous hash."""
+        return hashlib.sha256(prev + orjson.dumps(entry, option=AuditLogger._DUMP_OPTIONS)).digest()
+    
+    @contextmanager
+    def _lock_for(self, filepath: Path) -> Iterator[None]:
+        """Hold the lock guarding a session file's chain state."""
+        while True:
+            with self._lock:
+                lock = self._locks.get(filepath)
+                if lock is None:
+                    lock = self._locks[filepath] = threading.Lock()
+            with lock:
+                # end_session may have dropped this lock while we waited for it
+                if self._locks.get(filepath) is lock:
+                    yield
+                    return
 
 
 # Global audit logger instance
 _audit_logger: Optional[AuditLogger] = None
+_audit_logger_lock = threading.Lock()
 
 
 def get_audit_logger(log_dir: str = "audit_logs") -> AuditLogger:
     """Get or create the global audit logger instance."""
     global _audit_logger
     if _audit_logger is None:
-        _audit_logger = AuditLogger(log_dir)
+        # Guardian agents may race to create the logger on first use
+        with _audit_logger_lock:
+            if _audit_logger is None:
+                _audit_logger = AuditLogger(log_dir)
     return _audit_logger
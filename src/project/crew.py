@@ -80,7 +80,7 @@ class VeritasCrew():
         )
 
     # =====================================================
-    # 📋 GUARDIAN TASKS (Sequential Pipeline)
+    # 📋 GUARDIAN TASKS (Parallel Guardians -> CONCORDIA)
     # =====================================================
 
     @task
@@ -125,10 +125,10 @@ class VeritasCrew():
 
     @crew
     def crew(self) -> Crew:
-        """Creates the VERITAS crew with sequential processing"""
+        """Creates the VERITAS crew: four async Guardian tasks, then CONCORDIA"""
         return Crew(
             agents=self.agents,
             tasks=self.tasks,
-            process=Process.sequential,  # Pipeline: PRIVUS -> AEQUITAS -> LUMEN -> ETHOS -> CONCORDIA
+            process=Process.sequential,  # Guardians run async; CONCORDIA waits on their context
             verbose=True,
         )
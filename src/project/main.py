@@ -8,24 +8,34 @@ Usage:
     python main.py "Your query here"  # Process single query
 """
 
+import secrets
 import sys
 import warnings
-import uuid
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Optional
 
-from project.crew import VeritasCrew
-from project.models import (
-    TrustCertificate,
-    PrivacyReport,
-    BiasReport,
-    TransparencyReport,
-    EthicsReport,
-    AuditEntry
-)
+# project.crew pulls in crewai, LLM clients and the tools, which takes
+# hundreds of ms; it is imported where a crew is actually built so the
+# banner and argument handling come up immediately.
 
 warnings.filterwarnings("ignore", category=SyntaxWarning, module="pysbd")
 
+# Crew assembled once per process and reused by every audit
+_crew = None
+
+
+def get_veritas_crew():
+    """
+    Get the VERITAS crew, building it on first use.
+    Building loads the YAML configs and constructs all agents and tools,
+    so later audits reuse the same instance.
+    """
+    global _crew
+    if _crew is None:
+        from project.crew import VeritasCrew
+        _crew = VeritasCrew().crew()
+    return _crew
+
 
 def generate_base_response(user_input: str) -> str:
     """
@@ -56,17 +66,20 @@ def run_veritas_audit(
         Dictionary containing the audit results and final response
     """
     if session_id is None:
-        session_id = str(uuid.uuid4())[:8]
+        # 8 hex chars, same shape as the old uuid4 prefix
+        session_id = secrets.token_hex(4)
     
     if proposed_response is None:
         proposed_response = generate_base_response(user_input)
     
-    start_time = datetime.now()
+    # One timestamp for the whole audit, shared by every report it produces
+    start_time = datetime.now(timezone.utc)
     
     # Prepare inputs for the crew
     inputs = {
         'user_input': user_input,
         'proposed_response': proposed_response,
+        'audit_timestamp': start_time.isoformat(),
         # These will be populated as the pipeline progresses
         'privacy_report': '',
         'bias_report': '',
@@ -84,9 +97,9 @@ def run_veritas_audit(
     
     try:
         # Run the VERITAS crew
-        result = VeritasCrew().crew().kickoff(inputs=inputs)
+        result = get_veritas_crew().kickoff(inputs=inputs)
         
-        end_time = datetime.now()
+        end_time = datetime.now(timezone.utc)
         processing_time = (end_time - start_time).total_seconds() * 1000
         
         print("\n" + "=" * 60)
@@ -234,9 +247,17 @@ def train():
     """
     inputs = {
         'user_input': 'Sample training input',
-        'proposed_response': 'Sample training response'
+        'proposed_response': 'Sample training response',
+        'audit_timestamp': datetime.now(timezone.utc).isoformat(),
+        # Filled in by the guardian tasks, as in run_veritas_audit
+        'privacy_report': '',
+        'bias_report': '',
+        'transparency_report': '',
+        'ethics_report': '',
     }
     
+    from project.crew import VeritasCrew
+    
     try:
         n_iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 3
         filename = sys.argv[2] if len(sys.argv) > 2 else 'training_data.pkl'
@@ -254,6 +275,8 @@ def replay():
     """
     Replay a previous crew execution.
     """
+    from project.crew import VeritasCrew
+    
     try:
         task_id = sys.argv[1] if len(sys.argv) > 1 else None
         if task_id:
@@ -1,6 +1,6 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import List, Optional
-from datetime import datetime
+from datetime import datetime, timezone
 from enum import Enum
 
 
@@ -18,7 +18,20 @@ class FinalDecision(str, Enum):
     BLOCK = "block"
 
 
-class PIIEntity(BaseModel):
+def _utc_now() -> datetime:
+    """
+    Timestamp factory for the trust certificate (UTC avoids a local timezone lookup).
+    Guardian reports leave their timestamp unset; the audit is stamped once.
+    """
+    return datetime.now(timezone.utc)
+
+
+class _FrozenModel(BaseModel):
+    """Base for report models: immutable once built, so instances can be shared safely"""
+    model_config = ConfigDict(frozen=True)
+
+
+class PIIEntity(_FrozenModel):
     type: str
     value: str
     start_index: int
@@ -26,81 +39,90 @@ class PIIEntity(BaseModel):
     confidence: float
 
 
-class Redaction(BaseModel):
+class Redaction(_FrozenModel):
     original_text: str
     redacted_text: str
     reason: str
 
 
-class PrivacyReport(BaseModel):
+class PrivacyReport(_FrozenModel):
     pii_detected: List[PIIEntity] = Field(default_factory=list)
     privacy_score: int = Field(ge=0, le=100)
     redactions: List[Redaction] = Field(default_factory=list)
     gdpr_compliant: bool
-    timestamp: datetime = Field(default_factory=datetime.now)
+    timestamp: Optional[datetime] = None
 
 
-class BiasFlag(BaseModel):
+class BiasFlag(_FrozenModel):
     phrase: str
     bias_type: str
     severity: str
     alternative: str
 
 
-class BiasReport(BaseModel):
+class BiasReport(_FrozenModel):
     bias_score: int = Field(ge=0, le=100)
     flagged_phrases: List[BiasFlag] = Field(default_factory=list)
     neutral_alternatives: List[str] = Field(default_factory=list)
     categories_detected: List[str] = Field(default_factory=list)
-    timestamp: datetime = Field(default_factory=datetime.now)
+    timestamp: Optional[datetime] = None
 
 
-class Source(BaseModel):
+class Source(_FrozenModel):
     url: Optional[str] = None
     title: Optional[str] = None
     confidence: float
     verification_status: str
 
 
-class Claim(BaseModel):
+class Claim(_FrozenModel):
     claim_text: str
     confidence: float
     source: Optional[Source] = None
     verifiable: bool
 
 
-class TransparencyReport(BaseModel):
+class TransparencyReport(_FrozenModel):
     confidence_percentage: float = Field(ge=0.0, le=100.0)
     reasoning_chain: List[str] = Field(default_factory=list)
     sources_cited: List[Source] = Field(default_factory=list)
     claims_verified: int = 0
     claims_unverified: int = 0
     claims: List[Claim] = Field(default_factory=list)
-    timestamp: datetime = Field(default_factory=datetime.now)
+    timestamp: Optional[datetime] = None
 
 
-class EthicalConcern(BaseModel):
+class EthicalConcern(_FrozenModel):
     concern: str
     severity: str
     category: str
     recommendation: str
 
 
-class EthicsReport(BaseModel):
+class EthicsReport(_FrozenModel):
     ethics_score: int = Field(ge=0, le=100)
     safety_level: str  # safe, caution, blocked
     concerns: List[EthicalConcern] = Field(default_factory=list)
     alternatives_suggested: List[str] = Field(default_factory=list)
-    timestamp: datetime = Field(default_factory=datetime.now)
+    timestamp: Optional[datetime] = None
 
 
-class ConflictResolution(BaseModel):
+class ConflictResolution(_FrozenModel):
     conflict_description: str
     resolution_approach: str
     final_decision: str
 
 
-class TrustCertificate(BaseModel):
+# Report status icons indexed by (score >= 50) + (score >= 80)
+_SCORE_STATUS = ("❌", "⚠️", "✅")
+
+
+def _score_status(score: int) -> str:
+    """Map a 0-100 score to its report status icon"""
+    return _SCORE_STATUS[(score >= 50) + (score >= 80)]
+
+
+class TrustCertificate(_FrozenModel):
     overall_score: int = Field(ge=0, le=100)
     privacy: PrivacyReport
     bias: BiasReport
@@ -108,24 +130,19 @@ class TrustCertificate(BaseModel):
     ethics: EthicsReport
     final_decision: str = Field(default="proceed", description="proceed, warn, or block")
     conflicts_resolved: List[ConflictResolution] = Field(default_factory=list)
-    timestamp: datetime = Field(default_factory=datetime.now)
+    timestamp: datetime = Field(default_factory=_utc_now)
     session_id: Optional[str] = None
     final_response: str = Field(default="", description="The final response to show user")
     orchestrator_notes: str = Field(default="", description="Notes from CONCORDIA")
 
     def format_report(self) -> str:
         """Format trust certificate for display"""
-        def get_status(score: int) -> str:
-            if score >= 80:
-                return "✅"
-            elif score >= 50:
-                return "⚠️"
-            return "❌"
+        transparency_score = int(self.transparency.confidence_percentage)
         
-        privacy_status = get_status(self.privacy.privacy_score)
-        bias_status = get_status(self.bias.bias_score)
-        transparency_status = get_status(int(self.transparency.confidence_percentage))
-        ethics_status = get_status(self.ethics.ethics_score)
+        privacy_status = _score_status(self.privacy.privacy_score)
+        bias_status = _score_status(self.bias.bias_score)
+        transparency_status = _score_status(transparency_score)
+        ethics_status = _score_status(self.ethics.ethics_score)
         
         report = f"""
 ╔══════════════════════════════════════════════════════════════╗
@@ -133,7 +150,7 @@ class TrustCertificate(BaseModel):
 ╠══════════════════════════════════════════════════════════════╣
 ║ {privacy_status} Privacy Score:      {self.privacy.privacy_score:3d}/100
 ║ {bias_status} Bias Score:         {self.bias.bias_score:3d}/100
-║ {transparency_status} Transparency:       {int(self.transparency.confidence_percentage):3d}/100
+║ {transparency_status} Transparency:       {transparency_score:3d}/100
 ║ {ethics_status} Ethics Score:       {self.ethics.ethics_score:3d}/100
 ╠══════════════════════════════════════════════════════════════╣
 ║ 🎯 OVERALL TRUST SCORE: {self.overall_score:3d}/100
@@ -143,7 +160,7 @@ class TrustCertificate(BaseModel):
         return report
 
 
-class AuditEntry(BaseModel):
+class AuditEntry(_FrozenModel):
     timestamp: datetime
     session_id: str
     user_input: str
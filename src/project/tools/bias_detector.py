@@ -4,10 +4,38 @@ Detects biased language and suggests neutral alternatives
 """
 
 import re
-from typing import List, Dict, Tuple
+from collections import Counter
+from functools import lru_cache
+from itertools import groupby
+from typing import Callable, ClassVar, List, Dict, Sequence, Tuple
 from crewai.tools import BaseTool
 from pydantic import BaseModel, Field
 
+from project.tools.prefilter import LiteralMatcher, fold_case, scan_map
+
+
+# A finding's fixed fields: (type, severity, alternative, explanation)
+_Finding = Tuple[str, str, str, str]
+_Scanner = Callable[[str], List[Tuple[int, int, _Finding]]]
+
+
+def _table_scanner(matcher: LiteralMatcher, findings: Sequence[_Finding]) -> _Scanner:
+    """Specialize a single-pass scan over one table, with each pattern's finding prebuilt"""
+    def scan(text_lower: str, _finditer=matcher.finditer, _findings=tuple(findings)):
+        return [(start, end, _findings[index]) for start, end, index in _finditer(text_lower)]
+    return scan
+
+
+def _pattern_scanner(items: Sequence[Tuple[re.Pattern, _Finding]]) -> _Scanner:
+    """Specialize a pattern-by-pattern scan, with each pattern's finding prebuilt"""
+    def scan(text_lower: str, _items=tuple((pattern.finditer, finding) for pattern, finding in items)):
+        return [
+            (match.start(), match.end(), finding)
+            for finditer, finding in _items
+            for match in finditer(text_lower)
+        ]
+    return scan
+
 
 class BiasDetectorInput(BaseModel):
     """Input schema for Bias Detector"""
@@ -29,152 +57,156 @@ class BiasDetector(BaseTool):
     """
     args_schema: type[BaseModel] = BiasDetectorInput
 
-    # Bias patterns and alternatives
-    GENDER_BIAS: Dict[str, str] = {
-        r"\bchairman\b": "chairperson",
-        r"\bfireman\b": "firefighter",
-        r"\bpoliceman\b": "police officer",
-        r"\bstewardess\b": "flight attendant",
-        r"\bwaitress\b": "server",
-        r"\bmankind\b": "humankind",
-        r"\bman-made\b": "artificial/synthetic",
-        r"\bman hours\b": "person hours",
-        r"\bmanpower\b": "workforce",
-        r"\bfreshman\b": "first-year student",
-        r"\bmailman\b": "mail carrier",
-        r"\bsalesman\b": "salesperson",
-        r"\bbusinessman\b": "businessperson",
-        r"\bhe\s+or\s+she\b": "they",
-        r"\bhis\s+or\s+her\b": "their",
+    # Bias patterns and alternatives (compiled once at class creation, matched
+    # against the case-folded text, so they must stay lowercase)
+    GENDER_BIAS: ClassVar[Dict[re.Pattern, str]] = {
+        re.compile(pattern): alternative
+        for pattern, alternative in {
+            r"\bchairman\b": "chairperson",
+            r"\bfireman\b": "firefighter",
+            r"\bpoliceman\b": "police officer",
+            r"\bstewardess\b": "flight attendant",
+            r"\bwaitress\b": "server",
+            r"\bmankind\b": "humankind",
+            r"\bman-made\b": "artificial/synthetic",
+            r"\bman hours\b": "person hours",
+            r"\bmanpower\b": "workforce",
+            r"\bfreshman\b": "first-year student",
+            r"\bmailman\b": "mail carrier",
+            r"\bsalesman\b": "salesperson",
+            r"\bbusinessman\b": "businessperson",
+            r"\bhe\s+or\s+she\b": "they",
+            r"\bhis\s+or\s+her\b": "their",
+        }.items()
     }
 
-    STEREOTYPING_PHRASES: List[Dict[str, str]] = [
-        {"pattern": r"women are (bad|worse|terrible) at", "type": "gender", "severity": "high"},
-        {"pattern": r"men are (bad|worse|terrible) at", "type": "gender", "severity": "high"},
-        {"pattern": r"women can't", "type": "gender", "severity": "high"},
-        {"pattern": r"men can't", "type": "gender", "severity": "high"},
-        {"pattern": r"all (women|men|asians|blacks|whites|mexicans|indians)", "type": "generalization", "severity": "high"},
-        {"pattern": r"(women|men) always", "type": "gender", "severity": "medium"},
-        {"pattern": r"(women|men) never", "type": "gender", "severity": "medium"},
-        {"pattern": r"typical (woman|man|asian|black|white)", "type": "stereotyping", "severity": "high"},
-        {"pattern": r"you people", "type": "othering", "severity": "medium"},
-        {"pattern": r"those people", "type": "othering", "severity": "medium"},
-        {"pattern": r"old people can't", "type": "ageism", "severity": "medium"},
-        {"pattern": r"young people don't", "type": "ageism", "severity": "medium"},
-        {"pattern": r"millennials are", "type": "ageism", "severity": "low"},
-        {"pattern": r"boomers are", "type": "ageism", "severity": "low"},
+    STEREOTYPING_PHRASES: ClassVar[List[Dict]] = [
+        {**item, "pattern": re.compile(item["pattern"])}
+        for item in [
+            {"pattern": r"women are (bad|worse|terrible) at", "type": "gender", "severity": "high"},
+            {"pattern": r"men are (bad|worse|terrible) at", "type": "gender", "severity": "high"},
+            {"pattern": r"women can't", "type": "gender", "severity": "high"},
+            {"pattern": r"men can't", "type": "gender", "severity": "high"},
+            {"pattern": r"all (women|men|asians|blacks|whites|mexicans|indians)", "type": "generalization", "severity": "high"},
+            {"pattern": r"(women|men) always", "type": "gender", "severity": "medium"},
+            {"pattern": r"(women|men) never", "type": "gender", "severity": "medium"},
+            {"pattern": r"typical (woman|man|asian|black|white)", "type": "stereotyping", "severity": "high"},
+            {"pattern": r"you people", "type": "othering", "severity": "medium"},
+            {"pattern": r"those people", "type": "othering", "severity": "medium"},
+            {"pattern": r"old people can't", "type": "ageism", "severity": "medium"},
+            {"pattern": r"young people don't", "type": "ageism", "severity": "medium"},
+            {"pattern": r"millennials are", "type": "ageism", "severity": "low"},
+            {"pattern": r"boomers are", "type": "ageism", "severity": "low"},
+        ]
     ]
 
-    ABLEIST_TERMS: Dict[str, str] = {
-        r"\bcrazy\b": "intense/unpredictable",
-        r"\binsane\b": "extreme/unreasonable", 
-        r"\blame\b": "inadequate/weak",
-        r"\bdumb\b": "uninformed/silent",
-        r"\bstupid\b": "unwise/ill-considered",
-        r"\bidiot\b": "person who made a mistake",
-        r"\bmoron\b": "person who erred",
-        r"\bcrippled\b": "disabled/impaired",
-        r"\bhandicapped\b": "person with a disability",
-        r"\bblind to\b": "unaware of",
-        r"\bdeaf to\b": "ignoring",
-        r"\bturn a blind eye\b": "ignore",
+    ABLEIST_TERMS: ClassVar[Dict[re.Pattern, str]] = {
+        re.compile(pattern): alternative
+        for pattern, alternative in {
+            r"\bcrazy\b": "intense/unpredictable",
+            r"\binsane\b": "extreme/unreasonable", 
+            r"\blame\b": "inadequate/weak",
+            r"\bdumb\b": "uninformed/silent",
+            r"\bstupid\b": "unwise/ill-considered",
+            r"\bidiot\b": "person who made a mistake",
+            r"\bmoron\b": "person who erred",
+            r"\bcrippled\b": "disabled/impaired",
+            r"\bhandicapped\b": "person with a disability",
+            r"\bblind to\b": "unaware of",
+            r"\bdeaf to\b": "ignoring",
+            r"\bturn a blind eye\b": "ignore",
+        }.items()
     }
 
-    LOADED_LANGUAGE: List[str] = [
-        r"\bobviously\b",
-        r"\bclearly\b",
-        r"\beveryone knows\b",
-        r"\bnobody believes\b",
-        r"\bonly an idiot\b",
-        r"\breal men\b",
-        r"\breal women\b",
-        r"\bnormal people\b",
-        r"\bcommon sense\b",
+    LOADED_LANGUAGE: ClassVar[List[re.Pattern]] = [
+        re.compile(pattern)
+        for pattern in [
+            r"\bobviously\b",
+            r"\bclearly\b",
+            r"\beveryone knows\b",
+            r"\bnobody believes\b",
+            r"\bonly an idiot\b",
+            r"\breal men\b",
+            r"\breal women\b",
+            r"\bnormal people\b",
+            r"\bcommon sense\b",
+        ]
     ]
 
+    # Scanners specialized once per table, in report order. The word tables use a
+    # single-pass matcher; stereotyping phrases are scanned one by one because they
+    # can overlap ("all women always") and a single pass only reports one of them.
+    _SCANNERS: ClassVar[Tuple[_Scanner, ...]] = (
+        _table_scanner(LiteralMatcher(list(GENDER_BIAS)), [
+            ("gender_bias", "low", alternative, f"Consider using gender-neutral term: '{alternative}'")
+            for alternative in GENDER_BIAS.values()
+        ]),
+        _pattern_scanner([
+            (item["pattern"], (item["type"], item["severity"], "Avoid generalizations about groups",
+                               "This phrase makes broad generalizations about a group"))
+            for item in STEREOTYPING_PHRASES
+        ]),
+        _table_scanner(LiteralMatcher(list(ABLEIST_TERMS)), [
+            ("ableism", "medium", alternative, f"This term can be considered ableist. Consider: '{alternative}'")
+            for alternative in ABLEIST_TERMS.values()
+        ]),
+        _table_scanner(LiteralMatcher(LOADED_LANGUAGE), [
+            ("loaded_language", "low", "Remove or rephrase", "This phrase can be dismissive or create false consensus")
+        ] * len(LOADED_LANGUAGE)),
+    )
+
     def _run(self, text: str) -> str:
         """Analyze text for bias and return results"""
-        findings = []
-        text_lower = text.lower()
-        
-        # Check gender-biased terms
-        for pattern, alternative in self.GENDER_BIAS.items():
-            matches = re.finditer(pattern, text, re.IGNORECASE)
-            for match in matches:
-                findings.append({
-                    "type": "gender_bias",
-                    "phrase": match.group(),
-                    "severity": "low",
-                    "alternative": alternative,
-                    "explanation": f"Consider using gender-neutral term: '{alternative}'"
-                })
-        
-        # Check stereotyping phrases
-        for item in self.STEREOTYPING_PHRASES:
-            matches = re.finditer(item["pattern"], text, re.IGNORECASE)
-            for match in matches:
-                findings.append({
-                    "type": item["type"],
-                    "phrase": match.group(),
-                    "severity": item["severity"],
-                    "alternative": "Avoid generalizations about groups",
-                    "explanation": f"This phrase makes broad generalizations about a group"
-                })
-        
-        # Check ableist terms
-        for pattern, alternative in self.ABLEIST_TERMS.items():
-            matches = re.finditer(pattern, text, re.IGNORECASE)
-            for match in matches:
-                findings.append({
-                    "type": "ableism",
-                    "phrase": match.group(),
-                    "severity": "medium",
-                    "alternative": alternative,
-                    "explanation": f"This term can be considered ableist. Consider: '{alternative}'"
-                })
+        # Findings are stored column-wise: index i in each list is one finding
+        types: List[str] = []
+        phrases: List[str] = []
+        severities: List[str] = []
+        alternatives: List[str] = []
+        explanations: List[str] = []
+        text_lower = fold_case(text)
         
-        # Check loaded language
-        for pattern in self.LOADED_LANGUAGE:
-            matches = re.finditer(pattern, text, re.IGNORECASE)
-            for match in matches:
-                findings.append({
-                    "type": "loaded_language",
-                    "phrase": match.group(),
-                    "severity": "low",
-                    "alternative": "Remove or rephrase",
-                    "explanation": "This phrase can be dismissive or create false consensus"
-                })
+        # Gender terms, stereotyping phrases, ableist terms, then loaded language
+        for hits in scan_map(lambda scan: scan(text_lower), self._SCANNERS, len(text)):
+            for start, end, (bias_type, severity, alternative, explanation) in hits:
+                types.append(bias_type)
+                phrases.append(text[start:end])
+                severities.append(severity)
+                alternatives.append(alternative)
+                explanations.append(explanation)
         
-        if not findings:
+        if not types:
             return "NO_BIAS_DETECTED: Text appears to be balanced and fair."
         
         # Calculate bias score (100 = perfect, decrease based on findings)
         severity_weights = {"low": 5, "medium": 15, "high": 25}
-        total_penalty = sum(severity_weights.get(f["severity"], 10) for f in findings)
+        total_penalty = sum(severity_weights.get(severity, 10) for severity in severities)
         bias_score = max(0, 100 - total_penalty)
         
-        # Group findings by type
-        by_type: Dict[str, List] = {}
-        for f in findings:
-            t = f["type"]
-            if t not in by_type:
-                by_type[t] = []
-            by_type[t].append(f)
+        # Count findings per type (in order of first appearance), then visit the
+        # findings grouped by type with one stable sort
+        counts = Counter(types)
+        rank = {t: r for r, t in enumerate(counts)}
+        order = sorted(range(len(types)), key=[rank[t] for t in types].__getitem__)
         
         # Format output
-        output = f"BIAS_ANALYSIS: Found {len(findings)} potential issues\n"
-        output += f"FAIRNESS_SCORE: {bias_score}/100\n\n"
+        parts: List[str] = [
+            f"BIAS_ANALYSIS: Found {len(types)} potential issues\n",
+            f"FAIRNESS_SCORE: {bias_score}/100\n\n",
+        ]
         
-        for bias_type, items in by_type.items():
-            output += f"=== {bias_type.upper().replace('_', ' ')} ({len(items)} found) ===\n"
-            for item in items:
-                output += f"  [{item['severity'].upper()}] \"{item['phrase']}\"\n"
-                output += f"    → {item['explanation']}\n"
-                output += f"    → Suggestion: {item['alternative']}\n\n"
+        for bias_type, indices in groupby(order, key=types.__getitem__):
+            parts.append(f"=== {bias_type.upper().replace('_', ' ')} ({counts[bias_type]} found) ===\n")
+            for i in indices:
+                parts.extend((
+                    f"  [{severities[i].upper()}] \"{phrases[i]}\"\n",
+                    f"    → {explanations[i]}\n",
+                    f"    → Suggestion: {alternatives[i]}\n\n",
+                ))
         
-        return output
+        return "".join(parts)
 
 
+@lru_cache(maxsize=1)
 def get_bias_detector() -> BiasDetector:
-    """Factory function to get Bias Detector tool"""
+    """Factory function to get the shared Bias Detector tool (built on first call)"""
     return BiasDetector()
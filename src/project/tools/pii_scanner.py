@@ -4,10 +4,26 @@ Detects personally identifiable information in text
 """
 
 import re
-from typing import List, Dict, Any
+from functools import lru_cache
+from typing import Callable, ClassVar, List, Dict, Any, Tuple
 from crewai.tools import BaseTool
 from pydantic import BaseModel, Field
 
+from project.tools.prefilter import KeywordFinder, PatternPrefilter, fold_case, scan_map
+
+
+def _mask_email(value: str) -> str:
+    """Keep the first two characters of the local part and the domain"""
+    parts = value.split("@")
+    if len(parts) == 2:
+        return parts[0][:2] + "***@" + parts[1]
+    return "***@***"
+
+
+def _mask_middle(value: str) -> str:
+    """Keep the first and last two characters"""
+    return value[:2] + "*" * (len(value) - 4) + value[-2:]
+
 
 class PIIScannerInput(BaseModel):
     """Input schema for PII Scanner"""
@@ -30,146 +46,189 @@ class PIIScanner(BaseTool):
     """
     args_schema: type[BaseModel] = PIIScannerInput
 
-    # PII Detection Patterns
-    PII_PATTERNS: Dict[str, Dict[str, Any]] = {
-        "ssn": {
-            "pattern": r"\b\d{3}-\d{2}-\d{4}\b|\b\d{9}\b",
-            "severity": "critical",
-            "description": "Social Security Number"
-        },
-        "credit_card": {
-            "pattern": r"\b(?:4[0-9]{12}(?:[0-9]{3})?|5[1-5][0-9]{14}|3[47][0-9]{13}|6(?:011|5[0-9]{2})[0-9]{12})\b",
-            "severity": "critical",
-            "description": "Credit Card Number"
-        },
-        "credit_card_formatted": {
-            "pattern": r"\b\d{4}[-\s]?\d{4}[-\s]?\d{4}[-\s]?\d{4}\b",
-            "severity": "critical",
-            "description": "Credit Card Number (formatted)"
-        },
-        "email": {
-            "pattern": r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b",
-            "severity": "high",
-            "description": "Email Address"
-        },
-        "phone_us": {
-            "pattern": r"\b(?:\+1[-.\s]?)?(?:\(\d{3}\)|\d{3})[-.\s]?\d{3}[-.\s]?\d{4}\b",
-            "severity": "medium",
-            "description": "US Phone Number"
-        },
-        "phone_intl": {
-            "pattern": r"\b\+?[1-9]\d{1,14}\b",
-            "severity": "medium",
-            "description": "International Phone Number"
-        },
-        "ip_address": {
-            "pattern": r"\b(?:(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\.){3}(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\b",
-            "severity": "medium",
-            "description": "IP Address"
-        },
-        "api_key": {
-            "pattern": r"\b(?:api[_-]?key|apikey|api[_-]?secret|secret[_-]?key)[\s:=]+['\"]?[A-Za-z0-9_\-]{20,}['\"]?\b",
-            "severity": "critical",
-            "description": "API Key"
-        },
-        "password": {
-            "pattern": r"\b(?:password|passwd|pwd)[\s:=]+['\"]?[^\s'\"]{4,}['\"]?\b",
-            "severity": "critical",
-            "description": "Password"
-        },
-        "dob": {
-            "pattern": r"\b(?:0[1-9]|1[0-2])[/-](?:0[1-9]|[12][0-9]|3[01])[/-](?:19|20)\d{2}\b|\b(?:19|20)\d{2}[/-](?:0[1-9]|1[0-2])[/-](?:0[1-9]|[12][0-9]|3[01])\b",
-            "severity": "medium",
-            "description": "Date of Birth"
-        },
-        "aadhaar": {
-            "pattern": r"\b\d{4}[\s-]?\d{4}[\s-]?\d{4}\b",
-            "severity": "critical",
-            "description": "Aadhaar Number (India)"
-        },
-        "pan": {
-            "pattern": r"\b[A-Z]{5}[0-9]{4}[A-Z]\b",
-            "severity": "high",
-            "description": "PAN Card Number (India)"
-        }
+    # PII Detection Patterns (compiled once at class creation, matched against
+    # the case-folded text, so letters in them must be lowercase)
+    PII_PATTERNS: ClassVar[Dict[str, Dict[str, Any]]] = {
+        pii_type: {**config, "pattern": re.compile(config["pattern"])}
+        for pii_type, config in {
+            "ssn": {
+                "pattern": r"\b\d{3}-\d{2}-\d{4}\b|\b\d{9}\b",
+                "severity": "critical",
+                "description": "Social Security Number"
+            },
+            "credit_card": {
+                "pattern": r"\b(?:4[0-9]{12}(?:[0-9]{3})?|5[1-5][0-9]{14}|3[47][0-9]{13}|6(?:011|5[0-9]{2})[0-9]{12})\b",
+                "severity": "critical",
+                "description": "Credit Card Number"
+            },
+            "credit_card_formatted": {
+                "pattern": r"\b\d{4}[-\s]?\d{4}[-\s]?\d{4}[-\s]?\d{4}\b",
+                "severity": "critical",
+                "description": "Credit Card Number (formatted)"
+            },
+            "email": {
+                "pattern": r"\b[a-z0-9._%+-]+@[a-z0-9.-]+\.[a-z|]{2,}\b",
+                "severity": "high",
+                "description": "Email Address"
+            },
+            "phone_us": {
+                "pattern": r"\b(?:\+1[-.\s]?)?(?:\(\d{3}\)|\d{3})[-.\s]?\d{3}[-.\s]?\d{4}\b",
+                "severity": "medium",
+                "description": "US Phone Number"
+            },
+            "phone_intl": {
+                "pattern": r"\b\+?[1-9]\d{1,14}\b",
+                "severity": "medium",
+                "description": "International Phone Number"
+            },
+            "ip_address": {
+                "pattern": r"\b(?:(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\.){3}(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\b",
+                "severity": "medium",
+                "description": "IP Address"
+            },
+            "api_key": {
+                "pattern": r"\b(?:api[_-]?(?:key|secret)|secret[_-]?key)[\s:=]+['\"]?[a-z0-9_\-]{20,}['\"]?\b",
+                "severity": "critical",
+                "description": "API Key"
+            },
+            "password": {
+                "pattern": r"\b(?:passw(?:or)?d|pwd)[\s:=]+['\"]?[^\s'\"]{4,}['\"]?\b",
+                "severity": "critical",
+                "description": "Password"
+            },
+            "dob": {
+                "pattern": r"\b(?:(?:0[1-9]|1[0-2])[/-](?:0[1-9]|[12][0-9]|3[01])[/-](?:19|20)\d{2}|(?:19|20)\d{2}[/-](?:0[1-9]|1[0-2])[/-](?:0[1-9]|[12][0-9]|3[01]))\b",
+                "severity": "medium",
+                "description": "Date of Birth"
+            },
+            "aadhaar": {
+                "pattern": r"\b\d{4}[\s-]?\d{4}[\s-]?\d{4}\b",
+                "severity": "critical",
+                "description": "Aadhaar Number (India)"
+            },
+            "pan": {
+                "pattern": r"\b[a-z]{5}[0-9]{4}[a-z]\b",
+                "severity": "high",
+                "description": "PAN Card Number (India)"
+            }
+        }.items()
+    }
+
+    # Pattern table in scan order, with a one-pass filter over all of it
+    _PII_ITEMS: ClassVar[List[Tuple[str, Dict[str, Any]]]] = list(PII_PATTERNS.items())
+    _PREFILTER: ClassVar[PatternPrefilter] = PatternPrefilter([config["pattern"] for config in PII_PATTERNS.values()])
+
+    # Patterns built from digit runs; none of them can match text without a digit
+    _DIGIT_TYPES: ClassVar[frozenset] = frozenset({
+        "ssn", "credit_card", "credit_card_formatted", "phone_us", "phone_intl",
+        "ip_address", "dob", "aadhaar", "pan",
+    })
+    _HAS_DIGIT: ClassVar[re.Pattern] = re.compile(r"\d")
+
+    # Masking rule per PII type; values of four characters or fewer are fully starred
+    _MASKERS: ClassVar[Dict[str, Callable[[str], str]]] = {
+        "ssn": lambda value: "***-**-" + value[-4:],
+        "aadhaar": lambda value: "***-**-" + value[-4:],
+        "credit_card": lambda value: "**** **** **** " + value[-4:],
+        "credit_card_formatted": lambda value: "**** **** **** " + value[-4:],
+        "email": _mask_email,
+        "phone_us": lambda value: "***-***-" + value[-4:],
+        "phone_intl": lambda value: "***-***-" + value[-4:],
+        "password": lambda value: "[REDACTED]",
+        "api_key": lambda value: "[REDACTED]",
     }
 
+    # Keywords reported when no password, API key or SSN pattern matched
+    SENSITIVE_KEYWORDS: ClassVar[List[str]] = [
+        "password", "secret", "api key", "token", "credential", "ssn", "social security",
+    ]
+    _KEYWORD_FINDER: ClassVar[KeywordFinder] = KeywordFinder(SENSITIVE_KEYWORDS)
+
+    # Card matches must also pass the Luhn checksum
+    _CARD_TYPES: ClassVar[frozenset] = frozenset({"credit_card", "credit_card_formatted"})
+
     def _run(self, text: str) -> str:
         """Scan text for PII and return results"""
         results = []
-        text_lower = text.lower()
+        text_lower = fold_case(text)
+        skipped = frozenset() if self._HAS_DIGIT.search(text) else self._DIGIT_TYPES
+        indices = [
+            index for index in self._PREFILTER.candidates(text_lower)
+            if self._PII_ITEMS[index][0] not in skipped
+        ]
         
-        for pii_type, config in self.PII_PATTERNS.items():
-            pattern = config["pattern"]
-            matches = re.finditer(pattern, text, re.IGNORECASE)
-            
-            for match in matches:
-                # Mask the detected value for safety
-                value = match.group()
-                masked_value = self._mask_value(value, pii_type)
-                
+        for found in scan_map(lambda index: self._scan_pattern(index, text, text_lower), indices, len(text)):
+            results.extend(found)
+        
+        # Check for common sensitive keywords, unless patterns already caught them
+        already_detected = any(r["type"] in ("password", "api_key", "ssn") for r in results)
+        if not already_detected:
+            for keyword, idx in self._KEYWORD_FINDER.first_positions(text_lower):
                 results.append({
-                    "type": pii_type,
-                    "description": config["description"],
-                    "severity": config["severity"],
-                    "original_value": value,
-                    "masked_value": masked_value,
-                    "start_index": match.start(),
-                    "end_index": match.end()
+                    "type": "sensitive_keyword",
+                    "description": f"Sensitive keyword detected: {keyword}",
+                    "severity": "medium",
+                    "original_value": keyword,
+                    "masked_value": "[SENSITIVE]",
+                    "start_index": idx,
+                    "end_index": idx + len(keyword)
                 })
         
-        # Check for common sensitive keywords
-        sensitive_keywords = ["password", "secret", "api key", "token", "credential", "ssn", "social security"]
-        for keyword in sensitive_keywords:
-            if keyword in text_lower:
-                # Check if already detected by patterns
-                already_detected = any(r["type"] in ["password", "api_key", "ssn"] for r in results)
-                if not already_detected:
-                    idx = text_lower.find(keyword)
-                    results.append({
-                        "type": "sensitive_keyword",
-                        "description": f"Sensitive keyword detected: {keyword}",
-                        "severity": "medium",
-                        "original_value": keyword,
-                        "masked_value": "[SENSITIVE]",
-                        "start_index": idx,
-                        "end_index": idx + len(keyword)
-                    })
-        
         if not results:
             return "NO_PII_DETECTED: Text appears to be clean of personally identifiable information."
         
         # Format results
-        output = f"PII_DETECTED: Found {len(results)} potential PII items:\n\n"
+        parts: List[str] = [f"PII_DETECTED: Found {len(results)} potential PII items:\n\n"]
         for i, item in enumerate(results, 1):
-            output += f"{i}. [{item['severity'].upper()}] {item['description']}\n"
-            output += f"   Value: {item['masked_value']}\n"
-            output += f"   Position: {item['start_index']}-{item['end_index']}\n\n"
+            parts.extend((
+                f"{i}. [{item['severity'].upper()}] {item['description']}\n",
+                f"   Value: {item['masked_value']}\n",
+                f"   Position: {item['start_index']}-{item['end_index']}\n\n",
+            ))
         
-        return output
+        return "".join(parts)
 
-    def _mask_value(self, value: str, pii_type: str) -> str:
-        """Mask PII value for safe logging"""
-        if len(value) <= 4:
-            return "*" * len(value)
+    def _scan_pattern(self, index: int, text: str, text_lower: str) -> List[Dict[str, Any]]:
+        """Collect the findings of one PII pattern"""
+        pii_type, config = self._PII_ITEMS[index]
+        pattern = config["pattern"]
+        masker = self._MASKERS.get(pii_type, _mask_middle)
+        is_card = pii_type in self._CARD_TYPES
+        found = []
         
-        if pii_type in ["ssn", "aadhaar"]:
-            return "***-**-" + value[-4:]
-        elif pii_type in ["credit_card", "credit_card_formatted"]:
-            return "**** **** **** " + value[-4:]
-        elif pii_type == "email":
-            parts = value.split("@")
-            if len(parts) == 2:
-                return parts[0][:2] + "***@" + parts[1]
-            return "***@***"
-        elif pii_type in ["phone_us", "phone_intl"]:
-            return "***-***-" + value[-4:]
-        elif pii_type in ["password", "api_key"]:
-            return "[REDACTED]"
-        else:
-            return value[:2] + "*" * (len(value) - 4) + value[-2:]
+        match = pattern.search(text_lower)
+        while match:
+            value = text[match.start():match.end()]
+            if is_card and not self._luhn(value):
+                # A rejected span may overlap a real card number ("2024 4111 1111
+                # 1111 1111"), so search again from the next position
+                match = pattern.search(text_lower, match.start() + 1)
+                continue
+
+            # Mask the detected value for safety
+            masked_value = "*" * len(value) if len(value) <= 4 else masker(value)
+            
+            found.append({
+                "type": pii_type,
+                "description": config["description"],
+                "severity": config["severity"],
+                "original_value": value,
+                "masked_value": masked_value,
+                "start_index": match.start(),
+                "end_index": match.end()
+            })
+            match = pattern.search(text_lower, match.end())
+        return found
+
+    @staticmethod
+    def _luhn(value: str) -> bool:
+        """Check the Luhn checksum of a card number, ignoring separators"""
+        digits = [int(c) for c in value if c.isdecimal()]
+        total = sum(digits[-1::-2]) + sum(d * 2 - 9 if d > 4 else d * 2 for d in digits[-2::-2])
+        return total % 10 == 0
 
 
+@lru_cache(maxsize=1)
 def get_pii_scanner() -> PIIScanner:
-    """Factory function to get PII Scanner tool"""
+    """Factory function to get the shared PII Scanner tool (built on first call)"""
     return PIIScanner()
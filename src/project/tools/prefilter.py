@@ -0,0 +1,242 @@
+"""
+Multi-pattern matching for the Guardian tools
+Finds which of a tool's patterns occur in a text with one pass, so _run only
+executes the Python regexes that will actually produce findings
+"""
+
+import os
+import re
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple, TypeVar
+
+try:
+    import ahocorasick  # optional: pip install pyahocorasick
+except ImportError:
+    ahocorasick = None
+
+try:
+    import hyperscan  # optional: pip install hyperscan
+except ImportError:
+    hyperscan = None
+
+try:
+    import re2  # optional: pip install google-re2
+except ImportError:
+    re2 = None
+
+
+# Hyperscan's and RE2's \b, \d and \s only agree with Python's re on plain
+# ASCII text without \v or the \x1c-\x1f separators; anything else takes the
+# full scan.
+_PREFILTER_UNSAFE = re.compile(r"[^\x00-\x0a\x0c-\x1b\x20-\x7f]")
+
+# Pattern scans only fan out over threads for long texts, and only on a
+# free-threaded interpreter: Python's re holds the GIL for a whole match, so with
+# the GIL enabled a pool would just add overhead.
+PARALLEL_MIN_CHARS = 64_000
+_GIL_FREE = not getattr(sys, "_is_gil_enabled", lambda: True)()
+_scan_pool: Optional[ThreadPoolExecutor] = None
+_scan_pool_lock = threading.Lock()
+
+_T = TypeVar("_T")
+_R = TypeVar("_R")
+
+# Source of a pattern that is just a word-bounded phrase, e.g. \bman-made\b
+_LITERAL_SOURCE = re.compile(r"\\b([a-z][a-z -]*[a-z])\\b")
+# Non-ASCII letters that re.IGNORECASE treats as an ASCII letter. Mapping 'İ'
+# first also keeps lower() from expanding it to two code points.
+_ASCII_FOLDS = str.maketrans({"\u0130": "i", "\u0131": "i", "\u017f": "s", "\u212a": "k"})
+_ASCII_FOLD_CHARS = re.compile("[\u0130\u0131\u017f\u212a]")
+
+
+def fold_case(text: str) -> str:
+    """Lowercase text for the lowercase pattern tables, keeping offsets valid for text"""
+    # translate() copies the whole text, so it only runs when there is something to map
+    if text.isascii() or _ASCII_FOLD_CHARS.search(text) is None:
+        return text.lower()
+    return text.translate(_ASCII_FOLDS).lower()
+
+
+def _get_scan_pool() -> ThreadPoolExecutor:
+    """Get or create the shared pool for parallel pattern scans"""
+    global _scan_pool
+    if _scan_pool is None:
+        with _scan_pool_lock:
+            if _scan_pool is None:
+                _scan_pool = ThreadPoolExecutor(
+                    max_workers=min(4, os.cpu_count() or 1),
+                    thread_name_prefix="veritas-scan",
+                )
+    return _scan_pool
+
+
+def scan_map(scan: Callable[[_T], _R], items: Sequence[_T], text_length: int) -> List[_R]:
+    """Run scan over items in order, spread across threads when that can pay off"""
+    if not _GIL_FREE or text_length < PARALLEL_MIN_CHARS or len(items) < 2:
+        return [scan(item) for item in items]
+    return list(_get_scan_pool().map(scan, items))
+
+
+def _is_word(char: str) -> bool:
+    r"""Same test as \w in a str pattern"""
+    return char.isalnum() or char == "_"
+
+
+def _fuse(patterns: Sequence[re.Pattern], indices: Sequence[int]) -> re.Pattern:
+    """Combine patterns into one alternation with a named group per pattern"""
+    return re.compile("|".join(f"(?P<p{i}>{patterns[i].pattern})" for i in indices))
+
+
+class PatternPrefilter:
+    """Reports the indices of patterns that can match a text"""
+
+    def __init__(self, patterns: Sequence[re.Pattern]):
+        self._all = list(range(len(patterns)))
+        self._hs_db = self._build_hyperscan_db(patterns)
+        self._set = None if self._hs_db is not None else self._build_re2_set(patterns)
+        self._local = threading.local()
+
+    @staticmethod
+    def _build_hyperscan_db(patterns: Sequence[re.Pattern]):
+        """Compile the patterns into one Hyperscan block-mode database, or None"""
+        if hyperscan is None:
+            return None
+        try:
+            db = hyperscan.Database(mode=hyperscan.HS_MODE_BLOCK)
+            db.compile(
+                expressions=[pattern.pattern.encode() for pattern in patterns],
+                ids=list(range(len(patterns))),
+                elements=len(patterns),
+                flags=hyperscan.HS_FLAG_SINGLEMATCH,
+            )
+        except hyperscan.error:
+            return None
+        return db
+
+    @staticmethod
+    def _build_re2_set(patterns: Sequence[re.Pattern]):
+        """Compile the patterns into one RE2 set, or None if RE2 can't take them"""
+        if re2 is None:
+            return None
+        try:
+            pattern_set = re2.Set.SearchSet(re2.Options())
+            for pattern in patterns:
+                pattern_set.Add(pattern.pattern)
+            pattern_set.Compile()
+        except re2.error:
+            return None
+        return pattern_set
+
+    def _hyperscan_candidates(self, text: str) -> List[int]:
+        """Scan with Hyperscan, using scratch space private to the calling thread"""
+        scratch = getattr(self._local, "scratch", None)
+        if scratch is None:
+            scratch = self._local.scratch = hyperscan.Scratch(self._hs_db)
+        matched = set()
+        self._hs_db.scan(
+            text.encode(),
+            match_event_handler=lambda pattern_id, start, end, flags, context: matched.add(pattern_id),
+            scratch=scratch,
+        )
+        return sorted(matched)
+
+    def candidates(self, text: str) -> List[int]:
+        """Indices (in table order) of the patterns worth running on text"""
+        if self._hs_db is None and self._set is None:
+            return self._all
+        if _PREFILTER_UNSAFE.search(text):
+            return self._all
+        if self._hs_db is not None:
+            return self._hyperscan_candidates(text)
+        return sorted(self._set.Match(text) or ())
+
+
+class LiteralMatcher:
+    """
+    Single-pass matcher over a table of patterns.
+
+    finditer yields (start, end, index) for the same leftmost, non-overlapping
+    matches as finditer over one alternation of the table. Patterns that are
+    plain word-bounded phrases run through an Aho-Corasick automaton when
+    pyahocorasick is installed; the rest use the regex.
+    """
+
+    def __init__(self, patterns: Sequence[re.Pattern]):
+        indices = range(len(patterns))
+        self._regex = _fuse(patterns, indices)
+        self._group_index: Dict[str, int] = {f"p{i}": i for i in indices}
+
+        literals: Dict[int, str] = {}
+        for i in indices:
+            literal = _LITERAL_SOURCE.fullmatch(patterns[i].pattern)
+            if literal and not patterns[i].flags & re.IGNORECASE:
+                literals[i] = literal.group(1)
+        others = [i for i in indices if i not in literals]
+
+        self._automaton = self._build_automaton(literals)
+        self._rest: Optional[re.Pattern] = _fuse(patterns, others) if others else None
+
+    @staticmethod
+    def _build_automaton(literals: Dict[int, str]):
+        """Aho-Corasick automaton over the literal phrases, or None"""
+        if ahocorasick is None or not literals:
+            return None
+        automaton = ahocorasick.Automaton()
+        for index, phrase in literals.items():
+            automaton.add_word(phrase, (index, len(phrase)))
+        automaton.make_automaton()
+        return automaton
+
+    def finditer(self, text: str) -> Iterator[Tuple[int, int, int]]:
+        """Yield (start, end, pattern index) for each match in text order"""
+        if self._automaton is None:
+            for match in self._regex.finditer(text):
+                yield match.start(), match.end(), self._group_index[match.lastgroup]
+            return
+
+        found: List[Tuple[int, int, int]] = []
+        size = len(text)
+        for last, (index, length) in self._automaton.iter(text):
+            start, end = last + 1 - length, last + 1
+            if (start == 0 or not _is_word(text[start - 1])) and (end == size or not _is_word(text[end])):
+                found.append((start, end, index))
+        if self._rest is not None:
+            found.extend(
+                (match.start(), match.end(), self._group_index[match.lastgroup])
+                for match in self._rest.finditer(text)
+            )
+
+        # Keep the alternation's semantics: leftmost first, earliest pattern on ties
+        found.sort(key=lambda m: (m[0], m[2]))
+        taken_until = 0
+        for start, end, index in found:
+            if start >= taken_until:
+                taken_until = end
+                yield start, end, index
+
+
+class KeywordFinder:
+    """First occurrence of each of a fixed set of keywords, found in one pass"""
+
+    def __init__(self, keywords: Sequence[str]):
+        self._keywords = tuple(keywords)
+        self._automaton = None
+        if ahocorasick is not None:
+            self._automaton = ahocorasick.Automaton()
+            for keyword in self._keywords:
+                self._automaton.add_word(keyword, keyword)
+            self._automaton.make_automaton()
+
+    def first_positions(self, text: str) -> List[Tuple[str, int]]:
+        """(keyword, index) for each keyword found in text, in keyword order"""
+        if self._automaton is None:
+            positions = ((keyword, text.find(keyword)) for keyword in self._keywords)
+            return [(keyword, index) for keyword, index in positions if index >= 0]
+
+        first: Dict[str, int] = {}
+        for last, keyword in self._automaton.iter(text):
+            if keyword not in first:
+                first[keyword] = last + 1 - len(keyword)
+        return [(keyword, first[keyword]) for keyword in self._keywords if keyword in first]
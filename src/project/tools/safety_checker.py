@@ -4,10 +4,30 @@ Checks for harmful content, dangerous requests, and ethical violations
 """
 
 import re
-from typing import List, Dict
+from functools import lru_cache
+from typing import Callable, ClassVar, List, Dict, Sequence, Tuple
 from crewai.tools import BaseTool
 from pydantic import BaseModel, Field
 
+from project.tools.prefilter import PatternPrefilter, fold_case, scan_map
+
+
+# (start, end, category, severity, action) for one pattern match
+_Hit = Tuple[int, int, str, str, str]
+
+# Severity bits, OR-ed across concerns to pick the overall safety level
+_CRITICAL, _HIGH, _MEDIUM = 4, 2, 1
+_SEVERITY_BITS: Dict[str, int] = {"critical": _CRITICAL, "high": _HIGH, "medium": _MEDIUM}
+
+
+def _make_scanner(pattern_defs: Sequence[Dict]) -> Callable[[str, int], List[_Hit]]:
+    """Specialize the per-pattern scan, with each pattern's metadata unpacked up front"""
+    def scan(text_lower: str, index: int,
+             _defs=tuple((d["pattern"].finditer, d["category"], d["severity"], d["action"]) for d in pattern_defs)):
+        finditer, category, severity, action = _defs[index]
+        return [(match.start(), match.end(), category, severity, action) for match in finditer(text_lower)]
+    return scan
+
 
 class SafetyCheckerInput(BaseModel):
     """Input schema for Safety Checker"""
@@ -30,71 +50,85 @@ class SafetyChecker(BaseTool):
     args_schema: type[BaseModel] = SafetyCheckerInput
 
     # Dangerous content patterns (broad categories - actual blocking would need more sophisticated detection)
-    DANGEROUS_PATTERNS: List[Dict] = [
-        {
-            "pattern": r"\b(how to|make|create|build)\s*(a\s*)?(bomb|explosive|weapon|poison)\b",
-            "category": "dangerous_instructions",
-            "severity": "critical",
-            "action": "block"
-        },
-        {
-            "pattern": r"\b(hack|steal|break into|crack)\s*(password|account|system|computer)\b",
-            "category": "illegal_activity",
-            "severity": "high",
-            "action": "warn"
-        },
-        {
-            "pattern": r"\b(kill|murder|hurt|harm|attack)\s*(myself|yourself|someone|people)\b",
-            "category": "violence_threat",
-            "severity": "critical",
-            "action": "block"
-        },
-        {
-            "pattern": r"\b(suicide|self[- ]?harm|end my life|kill myself)\b",
-            "category": "self_harm",
-            "severity": "critical",
-            "action": "block_with_resources"
-        },
-        {
-            "pattern": r"\b(drug|cocaine|heroin|meth|fentanyl)\s*(deal|sell|make|cook|manufacture)\b",
-            "category": "illegal_activity",
-            "severity": "critical",
-            "action": "block"
-        },
+    DANGEROUS_PATTERNS: ClassVar[List[Dict]] = [
+        {**item, "pattern": re.compile(item["pattern"])}
+        for item in [
+            {
+                "pattern": r"\b(how to|make|create|build)\s*(a\s*)?(bomb|explosive|weapon|poison)\b",
+                "category": "dangerous_instructions",
+                "severity": "critical",
+                "action": "block"
+            },
+            {
+                "pattern": r"\b(hack|steal|break into|crack)\s*(password|account|system|computer)\b",
+                "category": "illegal_activity",
+                "severity": "high",
+                "action": "warn"
+            },
+            {
+                "pattern": r"\b(kill|murder|hurt|harm|attack)\s*(myself|yourself|someone|people)\b",
+                "category": "violence_threat",
+                "severity": "critical",
+                "action": "block"
+            },
+            {
+                "pattern": r"\b(suicide|self[- ]?harm|end my life|kill myself)\b",
+                "category": "self_harm",
+                "severity": "critical",
+                "action": "block_with_resources"
+            },
+            {
+                "pattern": r"\b(drug|cocaine|heroin|meth|fentanyl)\s*(deal|sell|make|cook|manufacture)\b",
+                "category": "illegal_activity",
+                "severity": "critical",
+                "action": "block"
+            },
+        ]
     ]
 
     # Manipulation tactics
-    MANIPULATION_PATTERNS: List[Dict] = [
-        {
-            "pattern": r"\b(pretend|act like|ignore|forget)\s*(you are|your|safety|rules|guidelines)\b",
-            "category": "jailbreak_attempt",
-            "severity": "medium",
-            "action": "warn"
-        },
-        {
-            "pattern": r"\b(dan|do anything now|evil mode|no restrictions)\b",
-            "category": "jailbreak_attempt", 
-            "severity": "medium",
-            "action": "warn"
-        },
-        {
-            "pattern": r"\bignore (all )?(previous|above|prior) (instructions|prompts|rules)\b",
-            "category": "jailbreak_attempt",
-            "severity": "high",
-            "action": "block"
-        },
+    MANIPULATION_PATTERNS: ClassVar[List[Dict]] = [
+        {**item, "pattern": re.compile(item["pattern"])}
+        for item in [
+            {
+                "pattern": r"\b(pretend|act like|ignore|forget)\s*(you are|your|safety|rules|guidelines)\b",
+                "category": "jailbreak_attempt",
+                "severity": "medium",
+                "action": "warn"
+            },
+            {
+                "pattern": r"\b(dan|do anything now|evil mode|no restrictions)\b",
+                "category": "jailbreak_attempt", 
+                "severity": "medium",
+                "action": "warn"
+            },
+            {
+                "pattern": r"\bignore (all )?(previous|above|prior) (instructions|prompts|rules)\b",
+                "category": "jailbreak_attempt",
+                "severity": "high",
+                "action": "block"
+            },
+        ]
     ]
 
     # Hate speech patterns  
-    HATE_PATTERNS: List[Dict] = [
-        {
-            "pattern": r"\b(hate|kill all|eliminate)\s*(jews|muslims|christians|blacks|whites|asians|gays|women|men)\b",
-            "category": "hate_speech",
-            "severity": "critical",
-            "action": "block"
-        },
+    HATE_PATTERNS: ClassVar[List[Dict]] = [
+        {**item, "pattern": re.compile(item["pattern"])}
+        for item in [
+            {
+                "pattern": r"\b(hate|kill all|eliminate)\s*(jews|muslims|christians|blacks|whites|asians|gays|women|men)\b",
+                "category": "hate_speech",
+                "severity": "critical",
+                "action": "block"
+            },
+        ]
     ]
 
+    # Every pattern category, scanned together
+    ALL_PATTERNS: ClassVar[List[Dict]] = DANGEROUS_PATTERNS + MANIPULATION_PATTERNS + HATE_PATTERNS
+    _PREFILTER: ClassVar[PatternPrefilter] = PatternPrefilter([item["pattern"] for item in ALL_PATTERNS])
+    _scan: ClassVar[Callable[[str, int], List[_Hit]]] = staticmethod(_make_scanner(ALL_PATTERNS))
+
     # Crisis resources
     CRISIS_RESOURCES: Dict[str, str] = {
         "self_harm": """
@@ -115,65 +149,68 @@ Please reach out - you are not alone.""",
     def _run(self, text: str) -> str:
         """Check text for safety concerns"""
         concerns = []
-        text_lower = text.lower()
+        severity_mask = 0
+        crisis_resource = ""
+        text_lower = fold_case(text)
         
         # Check all pattern categories
-        all_patterns = self.DANGEROUS_PATTERNS + self.MANIPULATION_PATTERNS + self.HATE_PATTERNS
-        
-        for pattern_def in all_patterns:
-            matches = re.finditer(pattern_def["pattern"], text, re.IGNORECASE)
-            for match in matches:
+        candidates = self._PREFILTER.candidates(text_lower)
+        for hits in scan_map(lambda index: self._scan(text_lower, index), candidates, len(text)):
+            for start, end, category, severity, action in hits:
                 concerns.append({
-                    "matched_text": match.group(),
-                    "category": pattern_def["category"],
-                    "severity": pattern_def["severity"],
-                    "action": pattern_def["action"]
+                    "matched_text": text[start:end],
+                    "category": category,
+                    "severity": severity,
+                    "action": action
                 })
+                severity_mask |= _SEVERITY_BITS.get(severity, 0)
+                # The first concern with crisis resources decides which are shown
+                if not crisis_resource and category in self.CRISIS_RESOURCES:
+                    crisis_resource = self.CRISIS_RESOURCES[category]
         
         if not concerns:
             return "SAFETY_CHECK_PASSED: No safety concerns detected. Content appears safe."
         
         # Determine overall safety level
-        severities = [c["severity"] for c in concerns]
-        if "critical" in severities:
+        if severity_mask & _CRITICAL:
             safety_level = "BLOCKED"
             ethics_score = 0
-        elif "high" in severities:
+        elif severity_mask & _HIGH:
             safety_level = "CAUTION"
             ethics_score = 30
         else:
             safety_level = "CAUTION"
             ethics_score = 60
         
-        # Check if we need crisis resources
-        crisis_resource = ""
-        for concern in concerns:
-            if concern["category"] in self.CRISIS_RESOURCES:
-                crisis_resource = self.CRISIS_RESOURCES[concern["category"]]
-                break
-        
         # Format output
-        output = f"SAFETY_LEVEL: {safety_level}\n"
-        output += f"ETHICS_SCORE: {ethics_score}/100\n"
-        output += f"CONCERNS_FOUND: {len(concerns)}\n\n"
+        parts: List[str] = [
+            f"SAFETY_LEVEL: {safety_level}\n",
+            f"ETHICS_SCORE: {ethics_score}/100\n",
+            f"CONCERNS_FOUND: {len(concerns)}\n\n",
+        ]
         
         for i, concern in enumerate(concerns, 1):
-            output += f"{i}. [{concern['severity'].upper()}] {concern['category'].replace('_', ' ').title()}\n"
-            output += f"   Matched: \"{concern['matched_text']}\"\n"
-            output += f"   Recommended Action: {concern['action'].upper()}\n\n"
+            parts.extend((
+                f"{i}. [{concern['severity'].upper()}] {concern['category'].replace('_', ' ').title()}\n",
+                f"   Matched: \"{concern['matched_text']}\"\n",
+                f"   Recommended Action: {concern['action'].upper()}\n\n",
+            ))
         
         if crisis_resource:
-            output += crisis_resource
+            parts.append(crisis_resource)
         
         # Provide ethical alternatives
-        output += "\n\n📚 ETHICAL ALTERNATIVES:\n"
-        output += "• I cannot provide information that could cause harm.\n"
-        output += "• I'm happy to help with safe and constructive alternatives.\n"
-        output += "• Consider reaching out to appropriate professionals or resources.\n"
+        parts.append(
+            "\n\n📚 ETHICAL ALTERNATIVES:\n"
+            "• I cannot provide information that could cause harm.\n"
+            "• I'm happy to help with safe and constructive alternatives.\n"
+            "• Consider reaching out to appropriate professionals or resources.\n"
+        )
         
-        return output
+        return "".join(parts)
 
 
+@lru_cache(maxsize=1)
 def get_safety_checker() -> SafetyChecker:
-    """Factory function to get Safety Checker tool"""
+    """Factory function to get the shared Safety Checker tool (built on first call)"""
     return SafetyChecker()
@@ -4,10 +4,14 @@ Traces reasoning and assesses claim confidence
 """
 
 import re
-from typing import List, Dict
+from bisect import bisect_right
+from functools import lru_cache
+from typing import ClassVar, List, Dict, Set, Tuple
 from crewai.tools import BaseTool
 from pydantic import BaseModel, Field
 
+from project.tools.prefilter import fold_case
+
 
 class SourceTracerInput(BaseModel):
     """Input schema for Source Tracer"""
@@ -27,57 +31,110 @@ class SourceTracer(BaseTool):
     """
     args_schema: type[BaseModel] = SourceTracerInput
 
+    # Marker patterns are matched against case-folded text and must stay lowercase
+
     # Patterns that indicate uncertainty
-    UNCERTAINTY_MARKERS: List[str] = [
-        r"\b(might|may|could|possibly|perhaps|probably)\b",
-        r"\b(I think|I believe|I assume|I guess)\b",
-        r"\b(it seems|it appears|it looks like)\b",
-        r"\b(reportedly|allegedly|supposedly)\b",
-        r"\b(uncertain|unclear|not sure|don't know)\b",
+    UNCERTAINTY_MARKERS: ClassVar[List[re.Pattern]] = [
+        re.compile(pattern)
+        for pattern in [
+            r"\b(might|may|could|possibly|perhaps|probably)\b",
+            r"\b(i think|i believe|i assume|i guess)\b",
+            r"\b(it seems|it appears|it looks like)\b",
+            r"\b(reportedly|allegedly|supposedly)\b",
+            r"\b(uncertain|unclear|not sure|don't know)\b",
+        ]
     ]
 
     # Patterns that indicate high confidence
-    CONFIDENCE_MARKERS: List[str] = [
-        r"\b(certainly|definitely|absolutely|always|never)\b",
-        r"\b(proven|established|confirmed|verified)\b",
-        r"\b(according to|research shows|studies show)\b",
-        r"\b(is|are|was|were)\b(?!\s+(possible|likely|maybe))",
+    CONFIDENCE_MARKERS: ClassVar[List[re.Pattern]] = [
+        re.compile(pattern)
+        for pattern in [
+            r"\b(certainly|definitely|absolutely|always|never)\b",
+            r"\b(proven|established|confirmed|verified)\b",
+            r"\b(according to|research shows|studies show)\b",
+            r"\b(is|are|was|were)\b(?!\s+(possible|likely|maybe))",
+        ]
     ]
 
     # Patterns indicating black-box assertions
-    BLACK_BOX_PATTERNS: List[str] = [
-        r"\bjust (trust|believe|accept)\b",
-        r"\beveryone knows\b",
-        r"\bit's obvious\b",
-        r"\bcommon knowledge\b",
-        r"\bgoes without saying\b",
-        r"\bno need to explain\b",
+    BLACK_BOX_PATTERNS: ClassVar[List[re.Pattern]] = [
+        re.compile(pattern)
+        for pattern in [
+            r"\bjust (trust|believe|accept)\b",
+            r"\beveryone knows\b",
+            r"\bit's obvious\b",
+            r"\bcommon knowledge\b",
+            r"\bgoes without saying\b",
+            r"\bno need to explain\b",
+        ]
     ]
 
     # Claim extraction patterns
-    CLAIM_PATTERNS: List[str] = [
-        r"([A-Z][^.!?]*(?:is|are|was|were|will|can|should|must)[^.!?]*[.!?])",
-        r"([A-Z][^.!?]*(?:always|never|all|every|no one)[^.!?]*[.!?])",
+    CLAIM_PATTERNS: ClassVar[List[re.Pattern]] = [
+        re.compile(pattern)
+        for pattern in [
+            r"([A-Z][^.!?]*(?:is|are|was|were|will|can|should|must)[^.!?]*[.!?])",
+            r"([A-Z][^.!?]*(?:always|never|all|every|no one)[^.!?]*[.!?])",
+        ]
     ]
 
+    # Sentence splitting and claim classification
+    SENTENCE_SPLIT: ClassVar[re.Pattern] = re.compile(r'(?<=[.!?])\s+')
+    STATISTIC_PATTERN: ClassVar[re.Pattern] = re.compile(r'\d+%|\d+\s*(percent|million|billion|thousand)')
+    OPINION_PATTERN: ClassVar[re.Pattern] = re.compile(r'\b(i think|i believe|in my opinion|i feel)\b')
+    RECOMMENDATION_PATTERN: ClassVar[re.Pattern] = re.compile(r'\b(should|recommend|suggest|advise)\b')
+
+    # Every per-sentence signal in one alternation, each group naming the signals
+    # it raises: confidence markers (uN/cN) and claim types. "i think" and
+    # "i believe" are both uncertainty marker u1 and an opinion, so they get a
+    # group of their own.
+    _SIGNAL_GROUPS: ClassVar[Dict[str, Tuple[Tuple[str, ...], str]]] = {
+        "statistical": (("statistical",), STATISTIC_PATTERN.pattern),
+        "opinion_u1": (("opinion", "u1"), r"\b(i think|i believe)\b"),
+        "opinion": (("opinion",), r"\b(in my opinion|i feel)\b"),
+        "u1": (("u1",), r"\b(i assume|i guess)\b"),
+        "recommendation": (("recommendation",), RECOMMENDATION_PATTERN.pattern),
+        **{f"u{i}": ((f"u{i}",), pattern.pattern) for i, pattern in enumerate(UNCERTAINTY_MARKERS) if i != 1},
+        **{f"c{i}": ((f"c{i}",), pattern.pattern) for i, pattern in enumerate(CONFIDENCE_MARKERS)},
+    }
+    _SIGNAL_RE: ClassVar[re.Pattern] = re.compile(
+        "|".join(f"(?P<{group}>{pattern})" for group, (_, pattern) in _SIGNAL_GROUPS.items())
+    )
+    _SIGNAL_NAMES: ClassVar[Dict[str, Tuple[str, ...]]] = {
+        group: names for group, (names, _) in _SIGNAL_GROUPS.items()
+    }
+
+    # Each sentence scores every marker pattern it contains once (uN: -15, cN: +10)
+    _MARKER_WEIGHTS: ClassVar[Dict[str, int]] = {
+        **{f"u{i}": -15 for i in range(len(UNCERTAINTY_MARKERS))},
+        **{f"c{i}": 10 for i in range(len(CONFIDENCE_MARKERS))},
+    }
+    # Claim types in order of precedence; a sentence with none is a question or factual
+    _CLAIM_TYPES: ClassVar[Tuple[str, ...]] = ("statistical", "opinion", "recommendation")
+
     def _run(self, text: str) -> str:
         """Analyze text for transparency and trace sources"""
         
-        # Split into sentences for analysis
-        sentences = re.split(r'(?<=[.!?])\s+', text)
+        # Split into sentences for analysis, as offsets into text
+        sentence_starts, spans = self._sentence_spans(text)
+        text_lower = fold_case(text)
+        
+        # One scan for every signal over the whole text, attributed to sentences by offset
+        sentence_signals = self._sentence_signals(text, text_lower, sentence_starts)
         
         claims = []
         total_confidence = 0
         
-        for sentence in sentences:
-            if len(sentence.strip()) < 10:
+        for (start, end), signals in zip(spans, sentence_signals):
+            if end - start < 10:
                 continue
-                
-            confidence = self._assess_sentence_confidence(sentence)
-            claim_type = self._classify_claim_type(sentence)
+            
+            confidence = max(0, min(100, 60 + sum(self._MARKER_WEIGHTS.get(name, 0) for name in signals)))
+            claim_type = next((t for t in self._CLAIM_TYPES if t in signals),
+                              "question" if text[end - 1] == "?" else "factual")
             
             claims.append({
-                "text": sentence.strip(),
+                "text": text[start:end],
                 "confidence": confidence,
                 "type": claim_type,
                 "verifiable": claim_type in ["factual", "statistical"],
@@ -87,9 +144,9 @@ class SourceTracer(BaseTool):
         # Check for black-box assertions
         black_box_issues = []
         for pattern in self.BLACK_BOX_PATTERNS:
-            matches = re.finditer(pattern, text, re.IGNORECASE)
+            matches = pattern.finditer(text_lower)
             for match in matches:
-                black_box_issues.append(match.group())
+                black_box_issues.append(text[match.start():match.end()])
         
         # Calculate overall transparency score
         if claims:
@@ -106,74 +163,73 @@ class SourceTracer(BaseTool):
         non_verifiable = len(claims) - verifiable
         
         # Format output
-        output = f"TRANSPARENCY_SCORE: {transparency_score}/100\n"
-        output += f"OVERALL_CONFIDENCE: {avg_confidence:.1f}%\n"
-        output += f"CLAIMS_ANALYZED: {len(claims)}\n"
-        output += f"VERIFIABLE: {verifiable} | NON-VERIFIABLE: {non_verifiable}\n\n"
+        parts: List[str] = [
+            f"TRANSPARENCY_SCORE: {transparency_score}/100\n",
+            f"OVERALL_CONFIDENCE: {avg_confidence:.1f}%\n",
+            f"CLAIMS_ANALYZED: {len(claims)}\n",
+            f"VERIFIABLE: {verifiable} | NON-VERIFIABLE: {non_verifiable}\n\n",
+        ]
         
         if black_box_issues:
-            output += "⚠️ BLACK-BOX ASSERTIONS DETECTED:\n"
-            for issue in black_box_issues:
-                output += f"  • \"{issue}\" - Consider providing reasoning\n"
-            output += "\n"
+            parts.append("⚠️ BLACK-BOX ASSERTIONS DETECTED:\n")
+            parts.extend(f"  • \"{issue}\" - Consider providing reasoning\n" for issue in black_box_issues)
+            parts.append("\n")
         
-        output += "=== CLAIM ANALYSIS ===\n"
+        parts.append("=== CLAIM ANALYSIS ===\n")
         for i, claim in enumerate(claims[:10], 1):  # Limit to first 10
             conf_emoji = "🟢" if claim["confidence"] >= 70 else "🟡" if claim["confidence"] >= 40 else "🔴"
-            output += f"{i}. {conf_emoji} [{claim['confidence']}%] ({claim['type']})\n"
-            output += f"   \"{claim['text'][:100]}{'...' if len(claim['text']) > 100 else ''}\"\n\n"
+            parts.extend((
+                f"{i}. {conf_emoji} [{claim['confidence']}%] ({claim['type']})\n",
+                f"   \"{claim['text'][:100]}{'...' if len(claim['text']) > 100 else ''}\"\n\n",
+            ))
         
         if len(claims) > 10:
-            output += f"... and {len(claims) - 10} more claims\n"
+            parts.append(f"... and {len(claims) - 10} more claims\n")
         
-        output += "\n=== REASONING CHAIN ===\n"
-        output += "• Text analyzed for factual claims\n"
-        output += "• Confidence assessed based on hedging language\n"
-        output += "• Black-box assertions flagged\n"
-        output += f"• Final transparency score: {transparency_score}/100\n"
+        parts.append(
+            "\n=== REASONING CHAIN ===\n"
+            "• Text analyzed for factual claims\n"
+            "• Confidence assessed based on hedging language\n"
+            "• Black-box assertions flagged\n"
+            f"• Final transparency score: {transparency_score}/100\n"
+        )
         
-        return output
+        return "".join(parts)
 
-    def _assess_sentence_confidence(self, sentence: str) -> int:
-        """Assess confidence level of a sentence (0-100)"""
-        confidence = 60  # Base confidence
-        
-        # Check uncertainty markers
-        for pattern in self.UNCERTAINTY_MARKERS:
-            if re.search(pattern, sentence, re.IGNORECASE):
-                confidence -= 15
-        
-        # Check confidence markers
-        for pattern in self.CONFIDENCE_MARKERS:
-            if re.search(pattern, sentence, re.IGNORECASE):
-                confidence += 10
-        
-        return max(0, min(100, confidence))
+    def _sentence_spans(self, text: str) -> Tuple[List[int], List[Tuple[int, int]]]:
+        """
+        Split text like SENTENCE_SPLIT.split without copying it.
 
-    def _classify_claim_type(self, sentence: str) -> str:
-        """Classify the type of claim"""
-        sentence_lower = sentence.lower()
-        
-        # Statistical claims
-        if re.search(r'\d+%|\d+\s*(percent|million|billion|thousand)', sentence):
-            return "statistical"
-        
-        # Opinion markers
-        if re.search(r'\b(I think|I believe|in my opinion|I feel)\b', sentence, re.IGNORECASE):
-            return "opinion"
-        
-        # Recommendation
-        if re.search(r'\b(should|recommend|suggest|advise)\b', sentence, re.IGNORECASE):
-            return "recommendation"
-        
-        # Question
-        if sentence.strip().endswith("?"):
-            return "question"
-        
-        # Default to factual assertion
-        return "factual"
+        Returns the offset where each sentence begins (for attributing matches)
+        and each sentence's (start, end) with surrounding whitespace excluded.
+        """
+        sentence_starts = [0]
+        ends = []
+        for match in self.SENTENCE_SPLIT.finditer(text):
+            ends.append(match.start())
+            sentence_starts.append(match.end())
+        ends.append(len(text))
+        
+        # Only the first sentence can begin, and only the last can end, with whitespace
+        spans = list(zip(sentence_starts, ends))
+        spans[0] = (len(text) - len(text.lstrip()), spans[0][1])
+        last_start = spans[-1][0]
+        spans[-1] = (last_start, max(last_start, len(text.rstrip())))
+        return sentence_starts, spans
+
+    def _sentence_signals(self, text: str, text_lower: str, sentence_starts: List[int]) -> List[Set[str]]:
+        """The signal names raised in each sentence"""
+        sentence_signals: List[Set[str]] = [set() for _ in sentence_starts]
+        for match in self._SIGNAL_RE.finditer(text_lower):
+            group = match.lastgroup
+            # Statistics are case-sensitive ("5 percent", not "5 Percent")
+            if group == "statistical" and not self.STATISTIC_PATTERN.fullmatch(text, match.start(), match.end()):
+                continue
+            sentence_signals[bisect_right(sentence_starts, match.start()) - 1].update(self._SIGNAL_NAMES[group])
+        return sentence_signals
 
 
+@lru_cache(maxsize=1)
 def get_source_tracer() -> SourceTracer:
-    """Factory function to get Source Tracer tool"""
+    """Factory function to get the shared Source Tracer tool (built on first call)"""
     return SourceTracer()
@@ -3,7 +3,10 @@ Trust Score Calculator Tool for CONCORDIA (Orchestrator)
 Calculates unified trust score from all agent reports
 """
 
-from typing import Dict, List, Optional
+from bisect import bisect_right
+from functools import lru_cache
+from itertools import combinations
+from typing import ClassVar, Dict, List, Optional, Tuple
 from crewai.tools import BaseTool
 from pydantic import BaseModel, Field
 
@@ -28,17 +31,46 @@ class TrustCalculator(BaseTool):
     args_schema: type[BaseModel] = TrustCalculatorInput
 
     # Score weights (should sum to 1.0)
-    WEIGHTS: Dict[str, float] = {
+    WEIGHTS: ClassVar[Dict[str, float]] = {
         "privacy": 0.30,      # Privacy is critical
         "bias": 0.20,         # Fairness matters
         "transparency": 0.20,  # Explainability important
         "ethics": 0.30,       # Ethics is critical
     }
+    # The weights by position, in the order of _run's score arguments (and of the
+    # scores dict), plus each weight as shown in the report
+    _WEIGHT_TUPLE: ClassVar[Tuple[float, ...]] = tuple(WEIGHTS.values())
+    _WEIGHT_DISPLAY: ClassVar[Tuple[Tuple[str, float], ...]] = tuple(
+        (f"{weight:.0%}", weight) for weight in WEIGHTS.values()
+    )
+
+    # Agents whose stricter score wins a conflict
+    _PRECEDENCE: ClassVar[frozenset] = frozenset({"ethics", "privacy"})
+
+    # Report markers: per score, indexed by (score >= 50) + (score >= 80), and per decision
+    _SCORE_EMOJI: ClassVar[Tuple[str, str, str]] = ("🔴", "🟡", "🟢")
+    _DECISION_EMOJI: ClassVar[Dict[str, str]] = {
+        "proceed": "✅",
+        "warn": "⚠️",
+        "block": "❌"
+    }
+
+    # Fixed parts of the report
+    _RULE: ClassVar[str] = "=" * 50
+    _HEADER: ClassVar[str] = f"{_RULE}\n        TRUST SCORE CALCULATION\n{_RULE}\n\nINDIVIDUAL SCORES:\n"
 
     # Thresholds for decisions
-    BLOCK_THRESHOLD: int = 30      # Below this = block
-    WARN_THRESHOLD: int = 60       # Below this = warn
-    CRITICAL_THRESHOLD: int = 20   # Any single score below this = block
+    BLOCK_THRESHOLD: ClassVar[int] = 30      # Below this = block
+    WARN_THRESHOLD: ClassVar[int] = 60       # Below this = warn
+    CRITICAL_THRESHOLD: ClassVar[int] = 20   # Any single score below this = block
+
+    # Decision and reason for each band of the overall score, split at the thresholds
+    _DECISION_BOUNDS: ClassVar[Tuple[int, ...]] = (BLOCK_THRESHOLD, WARN_THRESHOLD)
+    _DECISIONS: ClassVar[Tuple[Tuple[str, str], ...]] = (
+        ("block", "Overall trust score too low"),
+        ("warn", "Trust score indicates caution needed"),
+        ("proceed", "All checks passed"),
+    )
 
     def _run(
         self,
@@ -49,6 +81,24 @@ class TrustCalculator(BaseTool):
         critical_issues: str = ""
     ) -> str:
         """Calculate unified trust score and make final decision"""
+        return self.calculate(privacy_score, bias_score, transparency_score, ethics_score, critical_issues)
+
+    @classmethod
+    @lru_cache(maxsize=1024)
+    def calculate(
+        cls,
+        privacy_score: int,
+        bias_score: int,
+        transparency_score: int,
+        ethics_score: int,
+        critical_issues: str = ""
+    ) -> str:
+        """
+        Calculate unified trust score and make final decision.
+        For in-process callers that already hold valid 0-100 scores; calling
+        it directly skips the tool's argument validation. Reports are cached
+        by their inputs, so a repeated evaluation returns the same string.
+        """
         
         scores = {
             "privacy": privacy_score,
@@ -58,8 +108,8 @@ class TrustCalculator(BaseTool):
         }
         
         # Check for any critical issues that override scoring
-        if critical_issues and len(critical_issues.strip()) > 0:
-            return self._format_output(
+        if critical_issues and not critical_issues.isspace():
+            return cls._format_output(
                 overall_score=0,
                 scores=scores,
                 decision="block",
@@ -67,43 +117,40 @@ class TrustCalculator(BaseTool):
                 conflicts=[]
             )
         
-        # Check if any single score is critically low
-        critical_failures = []
-        for name, score in scores.items():
-            if score < self.CRITICAL_THRESHOLD:
-                critical_failures.append(f"{name.upper()}: {score}")
-        
-        if critical_failures:
-            return self._format_output(
-                overall_score=min(scores.values()),
+        # Check if any single score is critically low; the failures are only
+        # listed when the lowest score is below the threshold
+        min_score = min(privacy_score, bias_score, transparency_score, ethics_score)
+        if min_score < cls.CRITICAL_THRESHOLD:
+            critical_failures = [
+                f"{name.upper()}: {score}"
+                for name, score in scores.items()
+                if score < cls.CRITICAL_THRESHOLD
+            ]
+            return cls._format_output(
+                overall_score=min_score,
                 scores=scores,
                 decision="block",
                 reason=f"Critical failure in: {', '.join(critical_failures)}",
                 conflicts=[]
             )
         
-        # Calculate weighted average
-        overall_score = sum(
-            scores[name] * self.WEIGHTS[name]
-            for name in scores
-        )
+        # Calculate weighted average. The products are added one at a time:
+        # sum() and math.sumprod() round differently on 3.12+, which moves
+        # totals near .5 across round() and the decision thresholds
+        overall_score = 0.0
+        for score, weight in zip(
+            (privacy_score, bias_score, transparency_score, ethics_score), cls._WEIGHT_TUPLE
+        ):
+            overall_score += score * weight
         overall_score = int(round(overall_score))
         
         # Detect conflicts (when agents disagree significantly)
-        conflicts = self._detect_conflicts(scores)
+        conflicts = cls._detect_conflicts(scores)
         
         # Determine decision based on overall score
-        if overall_score < self.BLOCK_THRESHOLD:
-            decision = "block"
-            reason = "Overall trust score too low"
-        elif overall_score < self.WARN_THRESHOLD:
-            decision = "warn"
-            reason = "Trust score indicates caution needed"
-        else:
-            decision = "proceed"
-            reason = "All checks passed"
+        decision, reason = cls._DECISIONS[bisect_right(cls._DECISION_BOUNDS, overall_score)]
         
-        return self._format_output(
+        return cls._format_output(
             overall_score=overall_score,
             scores=scores,
             decision=decision,
@@ -111,33 +158,32 @@ class TrustCalculator(BaseTool):
             conflicts=conflicts
         )
 
-    def _detect_conflicts(self, scores: Dict[str, int]) -> List[Dict]:
+    @classmethod
+    def _detect_conflicts(cls, scores: Dict[str, int]) -> List[Dict]:
         """Detect significant disagreements between agents"""
         conflicts = []
-        score_list = list(scores.items())
         
-        for i, (name1, score1) in enumerate(score_list):
-            for name2, score2 in score_list[i+1:]:
-                diff = abs(score1 - score2)
-                if diff > 40:  # Significant disagreement
-                    # Determine how to resolve
-                    if "ethics" in (name1, name2) or "privacy" in (name1, name2):
-                        # Ethics and privacy take precedence
-                        winner = name1 if scores[name1] < scores[name2] else name2
-                        resolution = f"Deferring to stricter {winner} score for safety"
-                    else:
-                        resolution = "Averaging scores with slight penalty for disagreement"
-                    
-                    conflicts.append({
-                        "agents": [name1.upper(), name2.upper()],
-                        "scores": [score1, score2],
-                        "resolution": resolution
-                    })
+        for (name1, score1), (name2, score2) in combinations(scores.items(), 2):
+            if abs(score1 - score2) > 40:  # Significant disagreement
+                # Determine how to resolve
+                if not cls._PRECEDENCE.isdisjoint((name1, name2)):
+                    # Ethics and privacy take precedence
+                    winner = name1 if score1 < score2 else name2
+                    resolution = f"Deferring to stricter {winner} score for safety"
+                else:
+                    resolution = "Averaging scores with slight penalty for disagreement"
+                
+                conflicts.append({
+                    "agents": [name1.upper(), name2.upper()],
+                    "scores": [score1, score2],
+                    "resolution": resolution
+                })
         
         return conflicts
 
+    @classmethod
     def _format_output(
-        self,
+        cls,
         overall_score: int,
         scores: Dict[str, int],
         decision: str,
@@ -146,39 +192,33 @@ class TrustCalculator(BaseTool):
     ) -> str:
         """Format the trust calculation output"""
         
-        decision_emoji = {
-            "proceed": "✅",
-            "warn": "⚠️",
-            "block": "❌"
-        }
-        
-        output = "=" * 50 + "\n"
-        output += "        TRUST SCORE CALCULATION\n"
-        output += "=" * 50 + "\n\n"
-        
-        output += "INDIVIDUAL SCORES:\n"
-        for name, score in scores.items():
-            emoji = "🟢" if score >= 80 else "🟡" if score >= 50 else "🔴"
-            weight = self.WEIGHTS[name]
+        parts: List[str] = [cls._HEADER]
+        for (name, score), (weight_str, weight) in zip(scores.items(), cls._WEIGHT_DISPLAY):
+            emoji = cls._SCORE_EMOJI[(score >= 50) + (score >= 80)]
             contribution = int(score * weight)
-            output += f"  {emoji} {name.upper():15} {score:3d}/100 (weight: {weight:.0%}, contributes: {contribution})\n"
-        
-        output += f"\n{'=' * 50}\n"
-        output += f"OVERALL TRUST SCORE: {overall_score}/100\n"
-        output += f"DECISION: {decision_emoji.get(decision, '?')} {decision.upper()}\n"
-        output += f"REASON: {reason}\n"
-        output += f"{'=' * 50}\n"
+            parts.append(f"  {emoji} {name.upper():15} {score:3d}/100 (weight: {weight_str}, contributes: {contribution})\n")
+        
+        parts.append(
+            f"\n{cls._RULE}\n"
+            f"OVERALL TRUST SCORE: {overall_score}/100\n"
+            f"DECISION: {cls._DECISION_EMOJI.get(decision, '?')} {decision.upper()}\n"
+            f"REASON: {reason}\n"
+            f"{cls._RULE}\n"
+        )
         
         if conflicts:
-            output += "\n⚡ CONFLICTS DETECTED:\n"
-            for conflict in conflicts:
-                output += f"  • {conflict['agents'][0]} ({conflict['scores'][0]}) vs "
-                output += f"{conflict['agents'][1]} ({conflict['scores'][1]})\n"
-                output += f"    Resolution: {conflict['resolution']}\n"
+            parts.append("\n⚡ CONFLICTS DETECTED:\n")
+            parts.extend(
+                f"  • {conflict['agents'][0]} ({conflict['scores'][0]}) vs "
+                f"{conflict['agents'][1]} ({conflict['scores'][1]})\n"
+                f"    Resolution: {conflict['resolution']}\n"
+                for conflict in conflicts
+            )
         
-        return output
+        return "".join(parts)
 
 
+@lru_cache(maxsize=1)
 def get_trust_calculator() -> TrustCalculator:
-    """Factory function to get Trust Calculator tool"""
+    """Factory function to get the shared Trust Calculator tool (built on first call)"""
     return TrustCalculator()
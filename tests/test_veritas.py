@@ -1,6 +1,9 @@
 import pytest
 import sys
 import os
+import random
+import re
+import threading
 from datetime import datetime
 
 sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src", "project"))
@@ -9,7 +12,10 @@ from project.tools.pii_scanner import PIIScanner
 from project.tools.bias_detector import BiasDetector
 from project.tools.source_tracer import SourceTracer
 from project.tools.safety_checker import SafetyChecker
-from project.tools.trust_calculator import TrustCalculator
+from project.tools.trust_calculator import TrustCalculator, get_trust_calculator
+from project.audit_logger import AuditLogger
+from project.tools import prefilter
+from project.tools.prefilter import KeywordFinder, LiteralMatcher, PatternPrefilter, fold_case
 from project.models import (
     PrivacyReport,
     BiasReport,
@@ -19,154 +25,258 @@ from project.models import (
 )
 
 
-class TestPIIScanner:
-    def setup_method(self):
-        self.scanner = PIIScanner()
+# Tool instances are shared by all tests of a class; the tools hold no per-call state
+@pytest.fixture(scope="class")
+def pii_scanner():
+    return PIIScanner()
+
+
+@pytest.fixture(scope="class")
+def bias_detector():
+    return BiasDetector()
+
+
+@pytest.fixture(scope="class")
+def source_tracer():
+    return SourceTracer()
+
+
+@pytest.fixture(scope="class")
+def safety_checker():
+    return SafetyChecker()
+
+
+@pytest.fixture(scope="class")
+def trust_calculator():
+    return TrustCalculator()
 
-    def test_ssn_detection(self):
+
+class TestPIIScanner:
+    def test_ssn_detection(self, pii_scanner):
         text = "My SSN is 123-45-6789"
-        pii_entities = self.scanner.scan_text(text)
+        pii_entities = pii_scanner.scan_text(text)
         assert len(pii_entities) == 1
         assert pii_entities[0].type == "ssn"
         assert pii_entities[0].value == "123-45-6789"
 
-    def test_credit_card_detection(self):
+    def test_credit_card_detection(self, pii_scanner):
         text = "My credit card is 4111-1111-1111-1111"
-        pii_entities = self.scanner.scan_text(text)
+        pii_entities = pii_scanner.scan_text(text)
         assert len(pii_entities) == 1
         assert pii_entities[0].type == "credit_card"
 
-    def test_email_detection(self):
+    def test_email_detection(self, pii_scanner):
         text = "Contact me at john.doe@example.com"
-        pii_entities = self.scanner.scan_text(text)
+        pii_entities = pii_scanner.scan_text(text)
         assert len(pii_entities) == 1
         assert pii_entities[0].type == "email"
 
-    def test_privacy_score_calculation(self):
-        pii_entities = [self.scanner.scan_text("SSN: 123-45-6789")[0]]
-        score = self.scanner.calculate_privacy_score(pii_entities, 50)
+    def test_privacy_score_calculation(self, pii_scanner):
+        pii_entities = [pii_scanner.scan_text("SSN: 123-45-6789")[0]]
+        score = pii_scanner.calculate_privacy_score(pii_entities, 50)
         assert score < 100
         assert score >= 0
 
-    def test_redaction_generation(self):
+    def test_redaction_generation(self, pii_scanner):
         text = "SSN: 123-45-6789"
-        pii_entities = self.scanner.scan_text(text)
-        redactions = self.scanner.generate_redactions(pii_entities, text)
+        pii_entities = pii_scanner.scan_text(text)
+        redactions = pii_scanner.generate_redactions(pii_entities, text)
         assert len(redactions) == 1
         assert "***" in redactions[0].redacted_text
 
-    def test_gdpr_compliance(self):
-        pii_entities = self.scanner.scan_text("My email is test@example.com")
-        compliant = self.scanner.check_gdpr_compliance(pii_entities)
+    def test_gdpr_compliance(self, pii_scanner):
+        pii_entities = pii_scanner.scan_text("My email is test@example.com")
+        compliant = pii_scanner.check_gdpr_compliance(pii_entities)
         assert compliant == False
 
-    def test_no_pii_detection(self):
+    def test_no_pii_detection(self, pii_scanner):
         text = "This is a normal sentence without PII."
-        pii_entities = self.scanner.scan_text(text)
+        pii_entities = pii_scanner.scan_text(text)
         assert len(pii_entities) == 0
 
+    @pytest.mark.parametrize(
+        "text,position",
+        [
+            ("Order 2024 4111 1111 1111 1111", "11-30"),
+            ("1234\n4111-1111-1111-1111", "5-24"),
+        ],
+    )
+    def test_card_after_luhn_rejected_span(self, pii_scanner, text, position):
+        # The Luhn-invalid "2024 4111 1111 1111" must not hide the real card it overlaps
+        report = pii_scanner._run(text)
+        assert "Credit Card Number" in report
+        assert "**** **** **** 1111" in report
+        assert f"Position: {position}" in report
 
-class TestBiasDetector:
-    def setup_method(self):
-        self.detector = BiasDetector()
 
-    def test_gender_bias_detection(self):
+class TestBiasDetector:
+    def test_gender_bias_detection(self, bias_detector):
         text = "Men are better leaders than women"
-        bias_flags = self.detector.detect_bias(text)
+        bias_flags = bias_detector.detect_bias(text)
         assert len(bias_flags) > 0
         assert any("gender" in flag.bias_type for flag in bias_flags)
 
-    def test_racial_bias_detection(self):
+    def test_racial_bias_detection(self, bias_detector):
         text = "All Asian people are good at math"
-        bias_flags = self.detector.detect_bias(text)
+        bias_flags = bias_detector.detect_bias(text)
         assert len(bias_flags) > 0
         assert any("racial" in flag.bias_type for flag in bias_flags)
 
-    def test_bias_score_calculation(self):
+    def test_bias_score_calculation(self, bias_detector):
         text = "Men are naturally superior to women in all aspects"
-        bias_flags = self.detector.detect_bias(text)
-        score = self.detector.calculate_bias_score(bias_flags)
+        bias_flags = bias_detector.detect_bias(text)
+        score = bias_detector.calculate_bias_score(bias_flags)
         assert score < 100
         assert score >= 0
 
-    def test_neutral_alternatives(self):
+    def test_neutral_alternatives(self, bias_detector):
         text = "Women are too emotional for leadership"
-        bias_flags = self.detector.detect_bias(text)
-        alternatives = self.detector.generate_neutral_alternatives(bias_flags)
+        bias_flags = bias_detector.detect_bias(text)
+        alternatives = bias_detector.generate_neutral_alternatives(bias_flags)
         assert len(alternatives) > 0
 
-    def test_no_bias_detection(self):
+    def test_no_bias_detection(self, bias_detector):
         text = "People have different strengths and weaknesses."
-        bias_flags = self.detector.detect_bias(text)
+        bias_flags = bias_detector.detect_bias(text)
         assert len(bias_flags) == 0
 
 
 class TestSourceTracer:
-    def setup_method(self):
-        self.tracer = SourceTracer()
-
-    def test_claim_extraction(self):
+    def test_claim_extraction(self, source_tracer):
         text = "Research shows that exercise improves mental health"
-        claims = self.tracer.extract_claims(text)
+        claims = source_tracer.extract_claims(text)
         assert len(claims) > 0
         assert "exercise" in claims[0].claim_text.lower()
 
-    def test_confidence_calculation(self):
+    def test_confidence_calculation(self, source_tracer):
         text = "According to a peer-reviewed study, meditation reduces stress"
-        confidence = self.tracer._calculate_claim_confidence(text)
+        confidence = source_tracer._calculate_claim_confidence(text)
         assert confidence > 0.5
 
-    def test_source_extraction(self):
+    def test_source_extraction(self, source_tracer):
         text = "According to Harvard Medical School, sleep is essential"
-        sources = self.tracer.trace_sources(text)
+        sources = source_tracer.trace_sources(text)
         assert len(sources) > 0
         assert "Harvard" in sources[0].title
 
-    def test_transparency_analysis(self):
+    def test_transparency_analysis(self, source_tracer):
         text = "Research from Stanford University shows that regular exercise improves cognitive function. Studies indicate that 30 minutes of daily activity can enhance memory and attention."
-        analysis = self.tracer.analyze_transparency(text)
+        analysis = source_tracer.analyze_transparency(text)
         assert analysis["confidence_percentage"] > 0
         assert len(analysis["claims"]) > 0
 
 
-class TestSafetyChecker:
-    def setup_method(self):
-        self.checker = SafetyChecker()
+    # Expected results below are the original implementation's output
 
-    def test_dangerous_instructions_detection(self):
+    @staticmethod
+    def _trace(source_tracer, text):
+        """Transparency score, (confidence, type, text) per claim and black-box phrases"""
+        report = source_tracer._run(text)
+        score = int(re.search(r"TRANSPARENCY_SCORE: (\d+)/100", report).group(1))
+        claims = [
+            (int(m.group(1)), m.group(2), m.group(3))
+            for m in re.finditer(r'^\d+\. \S+ \[(\d+)%\] \((\w+)\)\n   "(.*)"$', report, re.M)
+        ]
+        return score, claims, re.findall(r'^  • "(.*)" - Consider', report, re.M)
+
+    @pytest.mark.parametrize(
+        "text,confidence,claim_type",
+        [
+            # Markers in one group count once, however many match
+            ("It seems it appears that this might, may or could probably be so.", 30, "factual"),
+            ("I think and I believe it is possible that studies show it was proven.", 75, "opinion"),
+            ("Results are likely wrong, but research shows they were confirmed and always verified.", 100, "factual"),
+        ],
+    )
+    def test_overlapping_markers(self, source_tracer, text, confidence, claim_type):
+        assert self._trace(source_tracer, text) == (confidence, [(confidence, claim_type, text)], [])
+
+    def test_black_box_phrases_overlapping_markers(self, source_tracer):
+        text = "Everyone knows it's obvious, just trust me: it is common knowledge that this is never unclear."
+        assert self._trace(source_tracer, text) == (
+            25,
+            [(65, "factual", text)],
+            ["just trust", "Everyone knows", "it's obvious", "common knowledge"],
+        )
+
+    @pytest.mark.parametrize(
+        "text,confidence,claim_type",
+        [
+            # Number words only count as statistics in lowercase
+            ("Sales grew 45 Percent and the team is happy.", 70, "factual"),
+            ("About 5 MILLION users are active on the platform.", 70, "factual"),
+            ("Roughly 10 percent of users are active right now.", 70, "statistical"),
+            ("Nearly 3 thouſand people were there, I think.", 55, "opinion"),
+            ("It costs 7 Billion, or 12% of the budget, should we pay?", 60, "statistical"),
+        ],
+    )
+    def test_statistic_patterns_are_case_sensitive(self, source_tracer, text, confidence, claim_type):
+        assert self._trace(source_tracer, text) == (confidence, [(confidence, claim_type, text)], [])
+
+    @pytest.mark.parametrize(
+        "text,score,claims",
+        [
+            ("", 50, []),
+            ("Short.", 50, []),
+            (
+                "   leading spaces then a claim that is true.  Trailing claim without a stop",
+                65,
+                [(70, "factual", "leading spaces then a claim that is true."), (60, "factual", "Trailing claim without a stop")],
+            ),
+            (
+                ". Starts with a stop. Then claims it is settled!",
+                65,
+                [(60, "factual", "Starts with a stop."), (70, "factual", "Then claims it is settled!")],
+            ),
+            (
+                "Is this a question that is asked?\nYes it is.\n\nShort.",
+                70,
+                [(70, "question", "Is this a question that is asked?"), (70, "factual", "Yes it is.")],
+            ),
+            ("Ends with an ellipsis which is odd...", 70, [(70, "factual", "Ends with an ellipsis which is odd...")]),
+            (
+                "No punctuation at all in this statement which is fine",
+                70,
+                [(70, "factual", "No punctuation at all in this statement which is fine")],
+            ),
+        ],
+    )
+    def test_sentence_boundaries(self, source_tracer, text, score, claims):
+        assert self._trace(source_tracer, text) == (score, claims, [])
+
+
+class TestSafetyChecker:
+    def test_dangerous_instructions_detection(self, safety_checker):
         text = "Here's how to make a bomb"
-        safety_data = self.checker.check_safety(text)
+        safety_data = safety_checker.check_safety(text)
         assert safety_data["safety_level"] == "blocked"
         assert len(safety_data["concerns"]) > 0
 
-    def test_hate_speech_detection(self):
+    def test_hate_speech_detection(self, safety_checker):
         text = "All [group] should be eliminated"
-        safety_data = self.checker.check_safety(text)
+        safety_data = safety_checker.check_safety(text)
         assert safety_data["safety_level"] == "blocked"
 
-    def test_misinformation_detection(self):
+    def test_misinformation_detection(self, safety_checker):
         text = "This oil cures cancer 100%"
-        safety_data = self.checker.check_safety(text)
+        safety_data = safety_checker.check_safety(text)
         assert safety_data["ethics_score"] < 80
 
-    def test_crisis_detection(self):
+    def test_crisis_detection(self, safety_checker):
         text = "I want to kill myself"
-        safety_data = self.checker.check_safety(text)
+        safety_data = safety_checker.check_safety(text)
         assert safety_data["crisis_detected"] == True
         assert len(safety_data["crisis_resources"]) > 0
 
-    def test_safe_content(self):
+    def test_safe_content(self, safety_checker):
         text = "Exercise is good for your health"
-        safety_data = self.checker.check_safety(text)
+        safety_data = safety_checker.check_safety(text)
         assert safety_data["safety_level"] == "safe"
         assert safety_data["ethics_score"] > 80
 
 
 class TestTrustCalculator:
-    def setup_method(self):
-        self.calculator = TrustCalculator()
-
-    def test_overall_score_calculation(self):
+    def test_overall_score_calculation(self, trust_calculator):
         privacy_report = PrivacyReport(
             pii_detected=[], privacy_score=90, redactions=[], gdpr_compliant=True
         )
@@ -195,10 +305,10 @@ class TestTrustCalculator:
             "ethics": ethics_report,
         }
 
-        overall_score = self.calculator.calculate_overall_trust_score(reports)
+        overall_score = trust_calculator.calculate_overall_trust_score(reports)
         assert 70 <= overall_score <= 100
 
-    def test_conflict_detection(self):
+    def test_conflict_detection(self, trust_calculator):
         privacy_report = PrivacyReport(
             pii_detected=[], privacy_score=60, redactions=[], gdpr_compliant=False
         )
@@ -227,10 +337,10 @@ class TestTrustCalculator:
             "ethics": ethics_report,
         }
 
-        conflicts = self.calculator.detect_conflicts(reports)
+        conflicts = trust_calculator.detect_conflicts(reports)
         assert len(conflicts) > 0
 
-    def test_decision_making(self):
+    def test_decision_making(self, trust_calculator):
         ethics_report = EthicsReport(
             ethics_score=20,
             safety_level="blocked",
@@ -239,10 +349,10 @@ class TestTrustCalculator:
         )
         reports = {"ethics": ethics_report}
 
-        decision = self.calculator.make_final_decision(50, reports, [])
+        decision = trust_calculator.make_final_decision(50, reports, [])
         assert decision == "block"
 
-    def test_trust_certificate_generation(self):
+    def test_trust_certificate_generation(self, trust_calculator):
         privacy_report = PrivacyReport(
             pii_detected=[], privacy_score=85, redactions=[], gdpr_compliant=True
         )
@@ -271,7 +381,7 @@ class TestTrustCalculator:
             "ethics": ethics_report,
         }
 
-        certificate = self.calculator.generate_trust_certificate(
+        certificate = trust_calculator.generate_trust_certificate(
             reports, "test input", "test response", "test-session"
         )
 
@@ -279,18 +389,347 @@ class TestTrustCalculator:
         assert certificate.overall_score > 0
         assert certificate.session_id == "test-session"
 
+    @pytest.mark.parametrize(
+        "scores,overall,decision",
+        [
+            ((29, 29, 29, 29), 29, "BLOCK"),
+            ((30, 30, 30, 30), 30, "WARN"),
+            ((20, 20, 21, 51), 30, "WARN"),  # 29.5 rounds to even
+            ((59, 59, 59, 59), 59, "WARN"),
+            ((60, 60, 60, 60), 60, "PROCEED"),
+            ((31, 21, 86, 96), 60, "PROCEED"),  # 59.5 rounds to even
+        ],
+    )
+    def test_decision_at_thresholds(self, trust_calculator, scores, overall, decision):
+        report = trust_calculator._run(*scores)
+        assert f"OVERALL TRUST SCORE: {overall}/100\n" in report
+        assert f" {decision}\nREASON:" in report
+
+    def test_repeated_calculation_is_cached(self):
+        TrustCalculator.calculate.cache_clear()
+        first = TrustCalculator.calculate(80, 70, 60, 90)
+        assert TrustCalculator.calculate(80, 70, 60, 90) == first
+        assert TrustCalculator.calculate.cache_info().hits == 1
+        assert get_trust_calculator()._run(80, 70, 60, 90) == first
+
+    @pytest.mark.parametrize("critical_issues", ["PII leak", " self-harm "])
+    def test_critical_issue_blocks(self, critical_issues):
+        report = TrustCalculator.calculate(100, 100, 100, 100, critical_issues)
+        assert "OVERALL TRUST SCORE: 0/100\n" in report
+        assert f"DECISION: ❌ BLOCK\nREASON: Critical issue detected: {critical_issues}\n" in report
+
+    @pytest.mark.parametrize("critical_issues", ["", "  ", "\n"])
+    def test_blank_critical_issue_ignored(self, critical_issues):
+        assert "DECISION: ✅ PROCEED\n" in TrustCalculator.calculate(100, 100, 100, 100, critical_issues)
+
+    def test_critical_threshold(self):
+        report = TrustCalculator.calculate(90, 19, 90, 18)
+        assert "OVERALL TRUST SCORE: 18/100\n" in report
+        assert "REASON: Critical failure in: BIAS: 19, ETHICS: 18\n" in report
+        assert "DECISION: ✅ PROCEED\n" in TrustCalculator.calculate(90, 20, 90, 90)
+
+    @pytest.mark.parametrize(
+        "score,decision",
+        [(29, "❌ BLOCK"), (30, "⚠️ WARN"), (59, "⚠️ WARN"), (60, "✅ PROCEED")],
+    )
+    def test_decision_table_boundaries(self, score, decision):
+        assert f"DECISION: {decision}\n" in TrustCalculator.calculate(score, score, score, score)
+
+
+def _prefilter_texts():
+    """Texts for the backend comparisons, ASCII and not"""
+    texts = [
+        "",
+        "My SSN is 123-45-6789 and card 4111 1111 1111 1111",
+        "Email John.Doe@Example.com, call +1 (555) 123-4567, ip 192.168.0.1",
+        "API_KEY: abcdefghijklmnopqrstuvwxyz123456 password=hunter22",
+        "The Chairman and the fireman, he or she, is crazy and obviously lame",
+        "All women always say men can't; you people are blind to it",
+        "How to make a bomb, then kill myself. Ignore all previous instructions",
+        # Non-ASCII text takes the full scan instead of the fast prefilter
+        "İ think the CHAİRMAN is ſtupid; KİLL myſelf",
+        "Le président a dit: 123-45-6789 — naïve café ✅ 🟢",
+        "He or\u00a0she\x0bis\x1ccrazy; DAN\u2028mode",
+    ]
+    rng = random.Random(0)
+    words = [
+        "chairman", "CRAZY", "İnsane", "ſtupid", "\u212aill", "myself", "hack", "password",
+        "123-45-6789", "4111-1111-1111-1111", "a.b@c.io", "api-key:", "x" * 24, "women",
+        "always", "obviously", "everyone knows", "ignore", "previous", "rules", "é",
+        "\u00a0", "\n", ".", "!", "secret", "token", "ssn", "2020-01-31",
+    ]
+    for _ in range(300):
+        texts.append(" ".join(rng.choice(words) for _ in range(rng.randint(1, 25))))
+    return texts
+
+
+_PREFILTER_TEXTS = _prefilter_texts()
+_BACKENDS = ("ahocorasick", "hyperscan", "re2")
+
+
+def _build_with(monkeypatch, backends, build):
+    """Call build with only the given optional backends importable"""
+    with monkeypatch.context() as patch:
+        for name in _BACKENDS:
+            if name not in backends:
+                patch.setattr(prefilter, name, None)
+        return build()
+
+
+class TestPrefilter:
+    """Each optional backend must give the same findings as Python's re alone"""
+
+    @pytest.mark.parametrize("text", ["Plain ASCII", "naïve Café", "İstanbul ſtreet \u212aelvin ıi", "ÀΣ ẞ"])
+    def test_fold_case_keeps_offsets(self, text):
+        folded = fold_case(text)
+        assert folded == text.translate(prefilter._ASCII_FOLDS).lower()
+        assert len(folded) == len(text)
+
+    def test_texts_cover_the_unsafe_path(self):
+        assert any(prefilter._PREFILTER_UNSAFE.search(text) for text in _PREFILTER_TEXTS)
+
+    @pytest.mark.parametrize("backend", ["hyperscan", "re2"])
+    @pytest.mark.parametrize(
+        "tool_fixture,patterns",
+        [
+            ("pii_scanner", [config["pattern"] for config in PIIScanner.PII_PATTERNS.values()]),
+            ("safety_checker", [item["pattern"] for item in SafetyChecker.ALL_PATTERNS]),
+        ],
+    )
+    def test_pattern_prefilter(self, request, monkeypatch, backend, tool_fixture, patterns):
+        if getattr(prefilter, backend) is None:
+            pytest.skip(f"{backend} is not installed")
+        tool = request.getfixturevalue(tool_fixture)
+        fast = _build_with(monkeypatch, {backend}, lambda: PatternPrefilter(patterns))
+        plain = _build_with(monkeypatch, set(), lambda: PatternPrefilter(patterns))
+        assert fast._hs_db is not None or fast._set is not None
+
+        def findings(prefilter_obj):
+            monkeypatch.setattr(type(tool), "_PREFILTER", prefilter_obj)
+            return [tool._run(text) for text in _PREFILTER_TEXTS]
+
+        assert findings(fast) == findings(plain)
+
+    @pytest.mark.parametrize(
+        "patterns",
+        [list(BiasDetector.GENDER_BIAS), list(BiasDetector.ABLEIST_TERMS), BiasDetector.LOADED_LANGUAGE],
+    )
+    def test_literal_matcher(self, monkeypatch, patterns):
+        if prefilter.ahocorasick is None:
+            pytest.skip("pyahocorasick is not installed")
+        fast = _build_with(monkeypatch, {"ahocorasick"}, lambda: LiteralMatcher(patterns))
+        plain = _build_with(monkeypatch, set(), lambda: LiteralMatcher(patterns))
+        assert fast._automaton is not None and plain._automaton is None
+
+        for text in _PREFILTER_TEXTS:
+            text_lower = fold_case(text)
+            assert list(fast.finditer(text_lower)) == list(plain.finditer(text_lower)), text
+
+    def test_keyword_finder(self, monkeypatch):
+        if prefilter.ahocorasick is None:
+            pytest.skip("pyahocorasick is not installed")
+        keywords = PIIScanner.SENSITIVE_KEYWORDS
+        fast = _build_with(monkeypatch, {"ahocorasick"}, lambda: KeywordFinder(keywords))
+        plain = _build_with(monkeypatch, set(), lambda: KeywordFinder(keywords))
+
+        for text in _PREFILTER_TEXTS:
+            text_lower = fold_case(text)
+            assert fast.first_positions(text_lower) == plain.first_positions(text_lower), text
+
+
+    @pytest.mark.parametrize("tool_fixture", ["pii_scanner", "bias_detector", "safety_checker"])
+    def test_parallel_scan_matches_serial(self, request, monkeypatch, tool_fixture):
+        tool = request.getfixturevalue(tool_fixture)
+        texts = _PREFILTER_TEXTS + [" ".join(_PREFILTER_TEXTS)]
+        serial = [tool._run(text) for text in texts]
+
+        # Force the thread pool, which normally only runs on free-threaded builds
+        monkeypatch.setattr(prefilter, "_GIL_FREE", True)
+        monkeypatch.setattr(prefilter, "PARALLEL_MIN_CHARS", 0)
+        assert [tool._run(text) for text in texts] == serial
+        assert prefilter._scan_pool is not None
+
+
+class TestAuditLogger:
+    def _log_session(self, logger, session_id):
+        logger.start_session(session_id)
+        logger.log_agent_report("privus", {"privacy_score": 90}, session_id)
+        logger.log_decision("proceed", "All checks passed", "hi", "hello", session_id)
+
+    def test_intact_chain_verifies(self, tmp_path):
+        with AuditLogger(str(tmp_path)) as logger:
+            self._log_session(logger, "intact")
+            assert logger.verify_chain("intact") == True
+
+    def test_edited_entry_breaks_chain(self, tmp_path):
+        with AuditLogger(str(tmp_path)) as logger:
+            self._log_session(logger, "edited")
+            logger.flush()
+
+            session_file = tmp_path / "session_edited.jsonl"
+            lines = session_file.read_bytes().splitlines(keepends=True)
+            lines[1] = lines[1].replace(b'"privacy_score":90', b'"privacy_score":10')
+            session_file.write_bytes(b"".join(lines))
+
+            assert logger.verify_chain("edited") == False
+
+    def test_resumed_session_keeps_chain(self, tmp_path):
+        with AuditLogger(str(tmp_path)) as logger:
+            self._log_session(logger, "resumed")
+
+        with AuditLogger(str(tmp_path)) as logger:
+            logger.log_agent_report("ethos", {"ethics_score": 95}, "resumed")
+            logger.end_session(120, "resumed")
+
+            history = logger.get_session_history("resumed")
+            assert [entry["event"] for entry in history] == [
+                "session_start", "agent_report", "decision", "agent_report", "session_end"
+            ]
+            assert logger.verify_chain("resumed") == True
+
+    def test_started_session_is_listed(self, tmp_path):
+        with AuditLogger(str(tmp_path)) as logger:
+            logger.start_session("a1")
+            assert logger.get_all_sessions() == ["a1"]
+
+    def test_close_stops_writer_thread(self, tmp_path):
+        threads_before = threading.active_count()
+        for _ in range(20):
+            with AuditLogger(str(tmp_path)) as logger:
+                logger.start_session("closed")
+        assert threading.active_count() == threads_before
+
+        # A closed logger starts a new writer when used again
+        logger.log_agent_report("privus", {"privacy_score": 90}, "closed")
+        assert len(logger.get_session_history("closed")) == 21
+        assert logger.verify_chain("closed") == True
+        logger.close()
+
+    def test_failed_file_does_not_affect_other_sessions(self, tmp_path):
+        with AuditLogger(str(tmp_path)) as logger:
+            logger.start_session("good")
+            logger.flush()
+
+            # "missing/bad" maps to a file in a directory that doesn't exist
+            logger.log_agent_report("privus", {"privacy_score": 1}, "missing/bad")
+            logger.log_agent_report("privus", {"privacy_score": 90}, "good")
+            logger.flush()
+
+            assert len(logger.get_session_history("good")) == 2
+            assert logger.verify_chain("good") == True
+            with pytest.raises(OSError):
+                logger.log_agent_report("privus", {"privacy_score": 1}, "missing/bad")
+
+    def test_ended_sessions_release_their_state(self, tmp_path):
+        with AuditLogger(str(tmp_path)) as logger:
+            for n in range(5):
+                self._log_session(logger, f"s{n}")
+                logger.end_session(10, f"s{n}")
+            assert logger.verify_chain("s4") == True
+            assert logger._locks == {} and logger._last_hash == {}
+
+    def test_new_session_invalidates_session_list(self, tmp_path):
+        with AuditLogger(str(tmp_path)) as logger:
+            logger.start_session("a1")
+            logger.flush()
+            # Age the directory so its listing is cached
+            old = os.stat(tmp_path).st_mtime_ns - 10**10
+            os.utime(tmp_path, ns=(old, old))
+            assert logger.get_all_sessions() == ["a1"]
+            assert logger._sessions_cache == (old, ["a1"])
+
+            logger.start_session("b2")
+            assert logger.get_all_sessions() == ["a1", "b2"]
+
+    def test_statistics_totals_and_averages(self, tmp_path):
+        with AuditLogger(str(tmp_path)) as logger:
+            self._log_session(logger, "s1")
+            logger.end_session(100, "s1")
+            logger.start_session("s2")
+            logger.log_decision("warn", "caution", "hi", "hello", "s2")
+            logger.log_decision("block", "unsafe", "hi", "", "s2")
+            logger.end_session(300, "s2")
+            logger.start_session("s3")  # still running
+            logger.start_session("s4")
+            logger.end_session(0, "s4")  # untimed sessions don't count towards the average
+
+            stats = logger.get_statistics()
+            assert stats["total_sessions"] == 4
+            assert stats["decisions"] == {"proceed": 1, "warn": 1, "block": 1}
+            assert stats["avg_processing_time_ms"] == 200
+            assert stats["common_issues"] == {}
+
+            # A decision appended after the first call changes the totals
+            logger.log_decision("proceed", "All checks passed", "hi", "hello", "s3")
+            logger.end_session(500, "s3")
+            stats = logger.get_statistics()
+            assert stats["decisions"] == {"proceed": 2, "warn": 1, "block": 1}
+            assert stats["avg_processing_time_ms"] == 300
+
+    def test_failed_write_reported_without_losing_next_entry(self, tmp_path):
+        with AuditLogger(str(tmp_path)) as logger:
+            logger.log_agent_report("privus", {"privacy_score": 1}, "missing/bad")
+            logger.flush()
+            (tmp_path / "session_missing").mkdir()
+
+            # The old failure is raised, but this entry is still written
+            with pytest.raises(OSError):
+                logger.log_agent_report("privus", {"privacy_score": 2}, "missing/bad")
+            logger.log_agent_report("privus", {"privacy_score": 3}, "missing/bad")
+
+            history = logger.get_session_history("missing/bad")
+            assert [entry["report"]["privacy_score"] for entry in history] == [2, 3]
+            assert logger.verify_chain("missing/bad") == True
+
+    def test_close_during_appends_keeps_every_entry(self, tmp_path):
+        logger = AuditLogger(str(tmp_path))
+        stop = threading.Event()
+
+        def append(session_id):
+            for i in range(2000):
+                logger.log_agent_report("privus", {"privacy_score": i}, session_id)
+
+        def close_repeatedly():
+            while not stop.is_set():
+                logger.close()
+
+        appenders = [threading.Thread(target=append, args=(f"t{n}",)) for n in range(8)]
+        closer = threading.Thread(target=close_repeatedly)
+        closer.start()
+        for thread in appenders:
+            thread.start()
+        for thread in appenders:
+            thread.join()
+        stop.set()
+        closer.join()
+
+        for n in range(8):
+            history = logger.get_session_history(f"t{n}")
+            assert [entry["report"]["privacy_score"] for entry in history] == list(range(2000))
+            assert logger.verify_chain(f"t{n}") == True
+        logger.close()
+
+    def test_statistics_skip_missing_keys(self, tmp_path):
+        with AuditLogger(str(tmp_path)) as logger:
+            self._log_session(logger, "s1")
+            logger.end_session(0, "s1")
+            logger.flush()
+            # An older or hand-edited log may lack the decision or timing fields
+            with open(tmp_path / "session_s1.jsonl", "a") as f:
+                f.write('{"event":"decision"}\n{"event":"session_end"}\n')
+
+            stats = logger.get_statistics()
+            assert stats["decisions"] == {"proceed": 1, "warn": 0, "block": 0}
+            assert stats["avg_processing_time_ms"] == 0
+
 
 class TestIntegration:
-    def test_full_pipeline(self):
+    def test_full_pipeline(
+        self, pii_scanner, bias_detector, source_tracer, safety_checker, trust_calculator
+    ):
         user_input = "My SSN is 123-45-6789 and I think men are better than women"
         proposed_response = "I understand you shared personal information and made a biased statement. Your SSN should be protected, and that statement contains gender bias."
 
-        pii_scanner = PIIScanner()
-        bias_detector = BiasDetector()
-        source_tracer = SourceTracer()
-        safety_checker = SafetyChecker()
-        trust_calculator = TrustCalculator()
-
         pii_entities = pii_scanner.scan_text(proposed_response)
         privacy_report = PrivacyReport(
             pii_detected=pii_entities,
@@ -345,33 +784,32 @@ class TestIntegration:
         assert certificate.final_decision in ["proceed", "warn", "block"]
 
 
-class TestBreakMeMode:
-    def test_edge_cases(self):
-        test_cases = [
-            ("My password is secret123", "Should detect password PII"),
-            ("Women belong in the kitchen", "Should detect gender bias"),
-            ("How to make a bomb", "Should be blocked for safety"),
-            ("All [race] are criminals", "Should detect hate speech"),
-            ("This miracle cure prevents all diseases", "Should detect misinformation"),
-            ("", "Should handle empty input"),
-            ("Normal text", "Should pass normal content"),
-        ]
+_EDGE_CASES = [
+    ("My password is secret123", "Should detect password PII"),
+    ("Women belong in the kitchen", "Should detect gender bias"),
+    ("How to make a bomb", "Should be blocked for safety"),
+    ("All [race] are criminals", "Should detect hate speech"),
+    ("This miracle cure prevents all diseases", "Should detect misinformation"),
+    ("", "Should handle empty input"),
+    ("Normal text", "Should pass normal content"),
+]
 
-        pii_scanner = PIIScanner()
-        bias_detector = BiasDetector()
-        safety_checker = SafetyChecker()
-
-        for user_input, description in test_cases:
-            if user_input:
-                pii_entities = pii_scanner.scan_text(user_input)
-                bias_flags = bias_detector.detect_bias(user_input)
-                safety_data = safety_checker.check_safety(user_input)
-
-                assert len(pii_entities) >= 0, f"PII scan failed for: {description}"
-                assert len(bias_flags) >= 0, f"Bias detection failed for: {description}"
-                assert safety_data["safety_level"] in ["safe", "caution", "blocked"], (
-                    f"Safety check failed for: {description}"
-                )
+
+class TestBreakMeMode:
+    @pytest.mark.parametrize("user_input,description", _EDGE_CASES)
+    def test_edge_case(
+        self, pii_scanner, bias_detector, safety_checker, user_input, description
+    ):
+        if user_input:
+            pii_entities = pii_scanner.scan_text(user_input)
+            bias_flags = bias_detector.detect_bias(user_input)
+            safety_data = safety_checker.check_safety(user_input)
+
+            assert len(pii_entities) >= 0, f"PII scan failed for: {description}"
+            assert len(bias_flags) >= 0, f"Bias detection failed for: {description}"
+            assert safety_data["safety_level"] in ["safe", "caution", "blocked"], (
+                f"Safety check failed for: {description}"
+            )
 
 
 if __name__ == "__main__":